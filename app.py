@@ -1,45 +1,77 @@
 from flask import Flask, request, jsonify, Blueprint
 from flask_migrate import Migrate
-from flask_mail import Mail, Message
+from flask_mail import Mail
 import os
-import jwt
+import re
+import io
+import csv
+import json
+import click
+from jwt import ExpiredSignatureError, InvalidTokenError
 from datetime import datetime, timedelta
 from functools import wraps
-from models import User, Property, Payment, Issue, Notification, Booking, PropertyImage
-from werkzeug.security import generate_password_hash, check_password_hash
-from database import db
-from models import UserType, PropertyStatus, PaymentStatus, IssueStatus, IssueType, BookingStatus, NotificationType
+from models import User, Property, Payment, Issue, Notification, Booking, PropertyImage, OutboxEmail
+from database import database_url, db, engine_options
+from models import UserType, PropertyStatus, PaymentStatus, IssueStatus, IssueType, NotificationType
 from decimal import Decimal
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from pagination import InvalidPageRequest, page_args, paginate
+from scopes import landlord_rows, user_by_email, user_rows
+from search import filter_properties, rebuild_property_index, search_properties
+from query_plans import full_scans
+from reservations import MAX_STAY_NIGHTS, filter_available, parse_stay_date, reserve_nights
+from reminders import INSERT_CHUNK_SIZE, due_reminders_query, reminder_notification
+from outbox import drain_outbox, enqueue_email, outbox_email
+from jobs import renew_lease, run_exclusive
+from principal_cache import principal_cache, principal_from_user
+from passwords import HashingBusy, PASSWORD_HASH_RETRY_AFTER, password_hasher
+from http_cache import conditional, row_version, table_versions
+from serializers import (
+    InvalidFieldset, serialize_property, serialize_user, USER_VIEW, PROPERTY_VIEW, BOOKING_VIEW,
+    PAYMENT_VIEW, ISSUE_VIEW, LANDLORD_PROPERTY_VIEW, LANDLORD_BOOKING_VIEW, LANDLORD_ISSUE_VIEW,
+)
+from json_provider import FastJSONProvider
+from exports import EXPORT_FORMATS, export_response
+from summaries import landlord_revenue, landlord_summary
+from rollups import diff_rollups, rebuild_rollups
+from imports import IMPORT_CHUNK_SIZE, ImportResult, import_properties
+from invoices import INVOICE_CHUNK_SIZE, billing_period, generate_invoices
+from metrics import init_metrics
+from replicas import init_replica_routing, replica_binds, sync_sqlite_replica
+from synthetic import GENERATE_BATCH_SIZE, generate_dataset
 from flasgger import Swagger
 import schedule
 import time
-import threading
 import logging
 from flask_cors import CORS
 import cloudinary
 from cloudinary.uploader import upload, destroy
 from cloudinary.utils import cloudinary_url
-from flask_jwt_extended import create_access_token, JWTManager, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, decode_token, JWTManager, jwt_required, get_jwt_identity
 
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 # Database configuration
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = (
+app.config['SQLALCHEMY_DATABASE_URI'] = database_url(
     f'sqlite:///{os.path.join(basedir, "mtaa_heaven.db")}'
 )
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+app.config['SQLALCHEMY_BINDS'] = replica_binds()
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'dev-secret-key'
 app.config['JWT_SECRET_KEY'] = 'jwt-secret-key'  # In production, use environment variable
 
 # Email configuration (mock for now)
-app.config['MAIL_SERVER'] = 'smtp.gmail.com'
-app.config['MAIL_PORT'] = 587
-app.config['MAIL_USE_TLS'] = True
-app.config['MAIL_USERNAME'] = 'your-email@gmail.com'  # Replace with actual email
-app.config['MAIL_PASSWORD'] = 'your-password'  # Replace with actual password
-app.config['MAIL_DEFAULT_SENDER'] = 'your-email@gmail.com'
+app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
+app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
+app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', 'True').lower() == 'true'
+app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME', 'your-email@gmail.com')  # Replace with actual email
+app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD', 'your-password')  # Replace with actual password
+app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', 'your-email@gmail.com')
 
 # Cloudinary configuration
 cloudinary.config(
@@ -50,6 +82,8 @@ cloudinary.config(
 
 # Initialize extensions
 db.init_app(app)
+init_metrics(app)
+init_replica_routing(app)
 migrate = Migrate(app, db)
 mail = Mail(app)
 jwt = JWTManager(app)
@@ -60,13 +94,37 @@ CORS(app, resources={
         "origins": ["http://localhost:5174", "http://localhost:5173", "http://127.0.0.1:5173"],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
         "allow_headers": ["Content-Type", "Authorization"],
+        # GET /api/issues returns a bare list and pages through this header
+        "expose_headers": ["X-Next-Cursor"],
         "supports_credentials": True
     }
 })
+
+
+@app.errorhandler(InvalidPageRequest)
+def handle_invalid_page_request(e):
+    return jsonify({'error': str(e)}), 400
+
+
+@app.errorhandler(InvalidFieldset)
+def handle_invalid_fieldset(e):
+    return jsonify({'error': str(e)}), 400
+
+
+@app.errorhandler(HashingBusy)
+def handle_hashing_busy(e):
+    response = jsonify({'error': 'Server is busy, please retry shortly'})
+    response.headers['Retry-After'] = str(PASSWORD_HASH_RETRY_AFTER)
+    return response, 503
+
+
 @app.route('/api/users', methods=['GET'])
 def get_users():    
-    users = User.query.all()
-    return jsonify({'success': True, 'users': [u.to_dict(only=('id', 'first_name', 'last_name', 'email', 'phone', 'user_type')) for u in users]})
+    cursor, limit = page_args(request.args)
+    fields = USER_VIEW.fieldset(request.args)
+    users, next_cursor = paginate(USER_VIEW.select(User.query, fields), User, cursor, limit)
+    serialize = USER_VIEW.serializer(fields)
+    return jsonify({'success': True, 'users': [serialize(u) for u in users], 'next_cursor': next_cursor})
 
 
 @app.route('/api/register', methods=['POST'])
@@ -83,7 +141,7 @@ def register():
     phone = data.get('phone')
     user_type = data.get('user_type')
     
-    password_hash = generate_password_hash(password)
+    password_hash = password_hasher.hash(password)
     
     new_user = User(first_name=first_name,last_name=last_name,email=email,password_hash=password_hash,phone=phone,user_type=user_type)
     db.session.add(new_user)
@@ -99,12 +157,17 @@ def login():
   if not email or not password:
     return jsonify({'error': 'Email and password are required'}), 400
   
-  user = User.query.filter_by(email=email).first()
-  if not user or not check_password_hash(user.password_hash, password):
+  user = user_by_email(email).first()
+  if not user or not password_hasher.verify(user.password_hash, password):
     return jsonify({'error': 'Invalid email or password'}), 401
   
+  # Upgrade hashes made with older KDF parameters while we have the password
+  if password_hasher.needs_rehash(user.password_hash):
+    user.password_hash = password_hasher.hash(password)
+    db.session.commit()
+  
   token = create_access_token(identity=user.id) 
-  return jsonify({'message': 'Login successful','token': token,'user': user.to_dict(only=("first_name","last_name","id","email","phone","user_type"))}), 200
+  return jsonify({'message': 'Login successful','token': token,'user': serialize_user(user)}), 200
 
 @app.route('/api/properties', methods=['POST'])
 def create_property():
@@ -132,97 +195,262 @@ def create_property():
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/properties/import', methods=['POST'])
+def import_properties_route():
+    if request.mimetype == 'text/csv':
+        rows = csv.DictReader(io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline=''))
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get('properties')
+        if not isinstance(data, list):
+            return jsonify({'error': 'Expected a JSON array of properties or a text/csv body'}), 400
+        rows = data
+    result = ImportResult()
+    try:
+        import_properties(rows, result=result)
+    except (csv.Error, UnicodeDecodeError) as e:
+        return jsonify({'error': f'Malformed CSV: {e}', **result.to_dict()}), 400
+    return jsonify({'success': True, **result.to_dict()})
+
 @app.route('/api/properties', methods=['GET'])
+@conditional(table_versions('properties'))
 def get_properties():
-    properties = Property.query.all()
-    return jsonify({'success': True, 'properties': [p.to_dict(only=('title',"description","id", "rent_amount","address", "city","bedrooms","bathrooms","url","type","area_sqft", "status")) for p in properties]})
+    cursor, limit = page_args(request.args)
+    fields = PROPERTY_VIEW.fieldset(request.args)
+    try:
+        query = filter_properties(Property.query, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    properties, next_cursor = paginate(PROPERTY_VIEW.select(query, fields), Property, cursor, limit)
+    serialize = PROPERTY_VIEW.serializer(fields)
+    return jsonify({'success': True, 'properties': [serialize(p) for p in properties], 'next_cursor': next_cursor})
+
+@app.route('/api/properties/search', methods=['GET'])
+def search_properties_route():
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'q is required'}), 400
+    _, limit = page_args(request.args)
+    properties = search_properties(q, limit)
+    return jsonify({'success': True, 'properties': [serialize_property(p) for p in properties]})
+
+@app.route('/api/properties/available', methods=['GET'])
+def get_available_properties():
+    if not request.args.get('start') or not request.args.get('end'):
+        return jsonify({'error': 'start and end are required'}), 400
+    try:
+        start_date = parse_stay_date(request.args['start'])
+        end_date = parse_stay_date(request.args['end'])
+    except ValueError:
+        return jsonify({'error': 'start and end must be ISO dates'}), 400
+    if end_date < start_date:
+        return jsonify({'error': 'end must not be before start'}), 400
+    cursor, limit = page_args(request.args)
+    fields = PROPERTY_VIEW.fieldset(request.args)
+    try:
+        query = filter_properties(Property.query, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    query = PROPERTY_VIEW.select(filter_available(query, start_date, end_date), fields)
+    properties, next_cursor = paginate(query, Property, cursor, limit)
+    serialize = PROPERTY_VIEW.serializer(fields)
+    return jsonify({'success': True, 'properties': [serialize(p) for p in properties], 'next_cursor': next_cursor})
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild the property full-text index from the properties table."""
+    rebuild_property_index()
+    print('Property search index rebuilt.')
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Fail if any hot query falls back to a full table scan."""
+    if db.engine.dialect.name != 'sqlite':
+        raise SystemExit(f'check-query-plans reads SQLite query plans; this database is {db.engine.dialect.name}.')
+    regressions = full_scans()
+    for label, plan in regressions.items():
+        print(f"Full table scan in {label}: {'; '.join(plan)}")
+    if regressions:
+        raise SystemExit(1)
+    print('All hot queries are index-backed.')
+
+@app.cli.command('import-properties')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True, help='Rows per INSERT and transaction.')
+def import_properties_command(path, chunk_size):
+    """Import properties from a CSV or JSON (array) file."""
+    started = time.perf_counter()
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        rows = csv.DictReader(f) if path.lower().endswith('.csv') else json.load(f)
+        result = import_properties(rows, chunk_size, defer_index=True)
+    elapsed = time.perf_counter() - started
+    for error in result.errors:
+        print(f"Row {error['row']}: {error['error']}")
+    print(f'Imported {result.imported} properties in {elapsed:.2f}s, {result.failed} rows rejected.')
+    if result.failed:
+        raise SystemExit(1)
+
+@app.cli.command('verify-rollups')
+def verify_rollups_command():
+    """Recompute the rollup tables from scratch and report any drift."""
+    differences = diff_rollups()
+    for table, key, expected, actual in differences:
+        print(f'{table} {key}: expected {expected}, found {actual}')
+    if differences:
+        raise SystemExit(1)
+    print('Rollup tables match the source tables.')
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Replace the rollup tables with a fresh recomputation."""
+    differences = rebuild_rollups()
+    db.session.commit()
+    print(f'Rollup tables rebuilt, {len(differences)} rows corrected.')
 
 @app.route('/api/properties/<int:property_id>', methods=['GET'])
+@conditional(row_version(Property, 'property_id'))
 def get_property(property_id):
     p = Property.query.get(property_id)
 
     if not p:
         return jsonify({'message': 'Property not found'}), 404
-    return jsonify({'sucesss': True, 'property': p.to_dict(only=('title',"description","id", "rent_amount","address", "city","bedrooms","bathrooms","url","type","area_sqft", "status"))})
+    return jsonify({'sucesss': True, 'property': serialize_property(p)})
 
 def send_rent_reminders():
     """Background task to send rent payment reminders"""
     with app.app_context():
         try:
             logging.info("Running rent reminder task...")
-
-            # Get all tenants with active bookings
-            active_bookings = Booking.query.filter_by(status=BookingStatus.CONFIRMED).all()
-
-            reminder_count = 0
-            for booking in active_bookings:
-                tenant = User.query.get(booking.tenant_id)
-                property_obj = Property.query.get(booking.property_id)
-
-                if not tenant or not property_obj:
-                    continue
-
-                # Check if rent is due soon (within 3 days)
-                today = datetime.utcnow().date()
-                rent_due_date = booking.end_date.date()
-
-                if rent_due_date <= today + timedelta(days=3) and rent_due_date >= today:
-                    # Check if reminder already sent recently (avoid spam)
-                    recent_reminder = Notification.query.filter_by(
-                        user_id=tenant.id,
-                        property_id=property_obj.id,
-                        notification_type=NotificationType.RENT_REMINDER
-                    ).filter(
-                        Notification.created_at >= datetime.utcnow() - timedelta(days=1)
-                    ).first()
-
-                    if not recent_reminder:
-                        # Create rent reminder notification
-                        reminder = Notification(
-                            title=f'Rent Due Reminder - {property_obj.title}',
-                            message=f'Your rent payment of KES {property_obj.rent_amount} for {property_obj.title} is due on {rent_due_date.strftime("%B %d, %Y")}. Please make payment to avoid late fees.',
-                            notification_type=NotificationType.RENT_REMINDER,
-                            user_id=tenant.id,
-                            property_id=property_obj.id
-                        )
-
-                        db.session.add(reminder)
-                        db.session.commit()
-
-                        # Mock email sending
-                        try:
-                            if app.config.get('TESTING'):
-                                logging.info(f"Mock rent reminder email sent to {tenant.email}: {reminder.title}")
-                            else:
-                                msg = Message(reminder.title,
-                                            sender=app.config['MAIL_DEFAULT_SENDER'],
-                                            recipients=[tenant.email])
-                                msg.body = reminder.message
-                                mail.send(msg)
-                                logging.info(f"Rent reminder email sent to {tenant.email}: {reminder.title}")
-                        except Exception as e:
-                            logging.error(f"Failed to send rent reminder email to {tenant.email}: {str(e)}")
-
-                        reminder_count += 1
-
-            logging.info(f"Rent reminder task completed. Sent {reminder_count} reminders.")
+            now = datetime.utcnow()
+
+            started = time.perf_counter()
+            due, seen = [], set()
+            for row in due_reminders_query(now):
+                # A tenant with several bookings on one property gets one reminder
+                if (row.tenant_id, row.property_id) not in seen:
+                    seen.add((row.tenant_id, row.property_id))
+                    due.append(row)
+            logging.info(f"Rent reminders: selected {len(due)} due reminders in {time.perf_counter() - started:.3f}s")
+
+            # Emails go through the outbox in the same transaction as their
+            # notification, so the job never waits on the mail server
+            started = time.perf_counter()
+            reminders = [reminder_notification(r) for r in due]
+            emails = [outbox_email(r.email, n['title'], n['message']) for r, n in zip(due, reminders)]
+            for i in range(0, len(reminders), INSERT_CHUNK_SIZE):
+                db.session.execute(insert(Notification), reminders[i:i + INSERT_CHUNK_SIZE])
+                db.session.execute(insert(OutboxEmail), emails[i:i + INSERT_CHUNK_SIZE])
+                db.session.commit()
+            logging.info(f"Rent reminders: inserted {len(reminders)} notifications and queued their emails in {time.perf_counter() - started:.3f}s")
+
+            logging.info(f"Rent reminder task completed. Sent {len(reminders)} reminders.")
 
         except Exception as e:
+            db.session.rollback()
             logging.error(f"Error in rent reminder task: {str(e)}")
 
+# Renewed before every batch, so the lease only has to outlast one batch
+OUTBOX_LEASE = timedelta(minutes=15)
+
+def renew_outbox_lease():
+    return renew_lease('send_outbox', OUTBOX_LEASE)
+
+def send_outbox():
+    """Background task to deliver queued emails"""
+    with app.app_context():
+        try:
+            sent, failed = drain_outbox(before_batch=renew_outbox_lease)
+            if sent or failed:
+                logging.info(f"Outbox drained: {sent} sent, {failed} failed.")
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Error in outbox task: {str(e)}")
+
+def generate_monthly_invoices():
+    """Background task to create this month's rent invoices"""
+    with app.app_context():
+        try:
+            period = billing_period(datetime.utcnow())
+            created, seen = generate_invoices(period)
+            logging.info(f"Invoices {period}: {created} created, {seen} confirmed bookings checked.")
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Error in invoice task: {str(e)}")
+
+@app.cli.command('generate-invoices')
+@click.option('--period', help='Billing month as YYYY-MM (default: the current month).')
+@click.option('--chunk-size', default=INVOICE_CHUNK_SIZE, show_default=True, help='Bookings per transaction.')
+def generate_invoices_command(period, chunk_size):
+    """Create the month's PENDING rent payments for confirmed bookings."""
+    period = period or billing_period(datetime.utcnow())
+    if not re.fullmatch(r'\d{4}-\d{2}', period):
+        raise click.BadParameter('must be YYYY-MM', param_hint='--period')
+    created, seen = generate_invoices(period, chunk_size)
+    print(f'{created} invoices created for {period}, {seen} confirmed bookings checked.')
+
+@app.cli.command('sync-replica')
+def sync_replica_command():
+    """Copy the primary SQLite database to the replica file."""
+    try:
+        path = sync_sqlite_replica()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f'Replica {path} is in sync with the primary.')
+
+@app.cli.command('generate-data')
+@click.option('--landlords', default=100, show_default=True)
+@click.option('--tenants', default=2000, show_default=True)
+@click.option('--properties', default=10000, show_default=True)
+@click.option('--bookings-per-property', default=4, show_default=True, help='Average; the actual number varies.')
+@click.option('--seed', default=0, show_default=True, help='Same seed, same data.')
+@click.option('--today', type=click.DateTime(['%Y-%m-%d']), help='Day the dates are laid out around (default: today).')
+@click.option('--batch-size', default=GENERATE_BATCH_SIZE, show_default=True, help='Rows buffered per table before each batch insert.')
+def generate_data_command(landlords, tenants, properties, bookings_per_property, seed, today, batch_size):
+    """Add a synthetic dataset for load testing."""
+    if landlords < 1 or tenants < 1:
+        raise click.BadParameter('at least one landlord and one tenant are needed')
+    started = time.perf_counter()
+    counts = generate_dataset(landlords, tenants, properties, bookings_per_property, seed, batch_size, today)
+    elapsed = time.perf_counter() - started
+    for table, count in counts.items():
+        print(f'{table:>16}: {count}')
+    total = sum(counts.values())
+    print(f'{total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s)')
+
+@app.cli.command('drain-outbox')
+def drain_outbox_command():
+    """Send every due email in the outbox once."""
+    # Under the worker's lease, so the two never send the same email
+    counts = []
+    run_exclusive(app, 'send_outbox', lambda: counts.append(drain_outbox(before_batch=renew_outbox_lease)),
+                  OUTBOX_LEASE)
+    if not counts:
+        raise click.ClickException('Could not take the send_outbox lease; a worker is draining the outbox.')
+    sent, failed = counts[0]
+    print(f'{sent} sent, {failed} failed.')
+
 def run_scheduler():
-    """Run the background scheduler"""
-    # Schedule rent reminders to run daily at 9 AM
-    schedule.every().day.at("09:00").do(send_rent_reminders)
+    """Run the background scheduler.
+
+    Started by worker.py, not by the web app. Several workers may run it;
+    each job takes a database lease first, so only one of them runs it.
+    """
+    # Schedule rent reminders to run daily at 9 AM. The lease is kept for an
+    # hour so workers waking up later in the same minute skip this run.
+    schedule.every().day.at("09:00").do(
+        run_exclusive, app, 'send_rent_reminders', send_rent_reminders, timedelta(hours=1), release=False)
+    schedule.every().minute.do(
+        run_exclusive, app, 'send_outbox', send_outbox, OUTBOX_LEASE)
+    # Invoices are keyed on (booking, period), so running daily only adds
+    # the ones for bookings confirmed since the last run
+    schedule.every().day.at("02:00").do(
+        run_exclusive, app, 'generate_invoices', generate_monthly_invoices, timedelta(hours=2))
 
     while True:
         schedule.run_pending()
         time.sleep(60)  # Check every minute
 
-# Start background scheduler in a separate thread
-scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-scheduler_thread.start()
-
 
 def token_required(f):
     @wraps(f)
@@ -233,13 +461,18 @@ def token_required(f):
         try:
             if token.startswith('Bearer '):
                 token = token.split(' ')[1]
-            data = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-            current_user = User.query.get(data['user_id'])
-            if not current_user:
-                return jsonify({'error': 'User not found'}), 401
-        except jwt.ExpiredSignatureError:
+            data = decode_token(token)
+            user_id = data['sub']
+            current_user = principal_cache.get(user_id, token)
+            if current_user is None:
+                user = db.session.get(User, user_id)
+                if not user:
+                    return jsonify({'error': 'User not found'}), 401
+                current_user = principal_from_user(user)
+                principal_cache.put(user_id, token, current_user)
+        except ExpiredSignatureError:
             return jsonify({'error': 'Token has expired'}), 401
-        except jwt.InvalidTokenError:
+        except InvalidTokenError:
             return jsonify({'error': 'Token is invalid'}), 401
         return f(current_user, *args, **kwargs)
     return decorated
@@ -261,19 +494,12 @@ def create_booking():
         if property_obj.status != PropertyStatus.AVAILABLE:
             return jsonify({'error': 'Property is not available'}), 400
         
-        # Check for duplicate bookings (overlapping dates)
         start_date = datetime.fromisoformat(data['start_date'].replace('Z', '+00:00'))
         end_date = datetime.fromisoformat(data['end_date'].replace('Z', '+00:00'))
-        
-        existing_booking = Booking.query.filter(
-            Booking.property_id == data['property_id'],
-            Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-            Booking.start_date < end_date,
-            Booking.end_date > start_date
-        ).first()
-        
-        if existing_booking:
-            return jsonify({'error': 'Property already booked for these dates'}), 400
+        if end_date < start_date:
+            return jsonify({'error': 'end_date must not be before start_date'}), 400
+        if (end_date.date() - start_date.date()).days > MAX_STAY_NIGHTS:
+            return jsonify({'error': f'Bookings can be at most {MAX_STAY_NIGHTS} nights'}), 400
         
         booking = Booking(
             tenant_id=data['tenant_id'],
@@ -284,6 +510,15 @@ def create_booking():
         )
         
         db.session.add(booking)
+        db.session.flush()
+        
+        # Overlaps are rejected by the booking_nights primary key rather than
+        # a SELECT beforehand, so concurrent requests cannot both succeed
+        try:
+            reserve_nights(booking)
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': 'Property already booked for these dates'}), 400
         db.session.commit()
         
         return jsonify({
@@ -310,27 +545,18 @@ def create_booking():
 def get_bookings():
     user_id = request.args.get('user_id')
     user_type = request.args.get('user_type')
+    cursor, limit = page_args(request.args)
+    fields = BOOKING_VIEW.fieldset(request.args)
     
     try:
-        if user_type == 'tenant':
-            bookings = Booking.query.filter_by(tenant_id=user_id).all()
-        elif user_type == 'landlord':
-            bookings = db.session.query(Booking).join(Property).filter(Property.landlord_id == user_id).all()
-        else:
-            bookings = Booking.query.all()
+        query = user_rows(Booking, user_type, user_id)
+        bookings, next_cursor = paginate(BOOKING_VIEW.select(query, fields), Booking, cursor, limit)
+        serialize = BOOKING_VIEW.serializer(fields)
         
         return jsonify({
             'success': True,
-            'bookings': [{
-                'id': b.id,
-                'tenant_id': b.tenant_id,
-                'property_id': b.property_id,
-                'start_date': b.start_date.isoformat(),
-                'end_date': b.end_date.isoformat(),
-                'status': b.status.value,
-                'special_requests': b.special_requests,
-                'created_at': b.created_at.isoformat()
-            } for b in bookings]
+            'bookings': [serialize(b) for b in bookings],
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
@@ -388,28 +614,18 @@ def create_payment():
 def get_payments():
     user_id = request.args.get('user_id')
     user_type = request.args.get('user_type')
+    cursor, limit = page_args(request.args)
+    fields = PAYMENT_VIEW.fieldset(request.args)
     
     try:
-        if user_type == 'tenant':
-            payments = Payment.query.filter_by(user_id=user_id).all()
-        elif user_type == 'landlord':
-            payments = db.session.query(Payment).join(Property).filter(Property.landlord_id == user_id).all()
-        else:
-            payments = Payment.query.all()
+        query = user_rows(Payment, user_type, user_id)
+        payments, next_cursor = paginate(PAYMENT_VIEW.select(query, fields), Payment, cursor, limit)
+        serialize = PAYMENT_VIEW.serializer(fields)
         
         return jsonify({
             'success': True,
-            'payments': [{
-                'id': p.id,
-                'amount': str(p.amount),
-                'status': p.status.value,
-                'due_date': p.due_date.isoformat() if p.due_date else None,
-                'payment_date': p.payment_date.isoformat() if p.payment_date else None,
-                'user_id': p.user_id,
-                'property_id': p.property_id,
-                'payment_method': p.payment_method,
-                'notes': p.notes
-            } for p in payments]
+            'payments': [serialize(p) for p in payments],
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
@@ -483,66 +699,103 @@ def create_issue():
 
 @app.route('/api/issues', methods=['GET'])
 def get_issues():
+    cursor, limit = page_args(request.args)
+    fields = ISSUE_VIEW.fieldset(request.args)
     try:
-        issues = Issue.query.all()
-        return jsonify([{'id': i.id, 'description': i.description, 'status': i.status.value, 'user_id': i.reporter_id, 'property_id': i.property_id} for i in issues])
+        issues, next_cursor = paginate(ISSUE_VIEW.select(Issue.query, fields), Issue, cursor, limit)
+        serialize = ISSUE_VIEW.serializer(fields)
+        response = jsonify([serialize(i) for i in issues])
+        # This route returns a bare list, so the cursor travels in a header
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
     except Exception as e:
         return jsonify({'error': 'Server error'}), 500
 
 @app.route('/api/properties/landlord/<int:landlord_id>', methods=['GET'])
+@conditional(table_versions('properties'))
 def get_landlord_properties(landlord_id):
+    cursor, limit = page_args(request.args)
+    fields = LANDLORD_PROPERTY_VIEW.fieldset(request.args)
     try:
-        properties = Property.query.filter_by(landlord_id=landlord_id).all()
+        query = LANDLORD_PROPERTY_VIEW.select(landlord_rows(Property, landlord_id), fields)
+        properties, next_cursor = paginate(query, Property, cursor, limit)
+        serialize = LANDLORD_PROPERTY_VIEW.serializer(fields)
         return jsonify({
-            'data': [{
-                'id': p.id,
-                'title': p.title,
-                'rent_amount': float(p.rent_amount),
-                'status': p.status.value,
-                'city': p.city,
-                'bedrooms': p.bedrooms,
-                'bathrooms': p.bathrooms
-            } for p in properties]
+            'data': [serialize(p) for p in properties],
+            'next_cursor': next_cursor
         })
     except Exception as e:
         return jsonify({'error': 'Server error'}), 500
 
 @app.route('/api/bookings/landlord/<int:landlord_id>', methods=['GET'])
+@conditional(table_versions('bookings', 'properties'))
 def get_landlord_bookings(landlord_id):
+    cursor, limit = page_args(request.args)
+    fields = LANDLORD_BOOKING_VIEW.fieldset(request.args)
     try:
-        bookings = db.session.query(Booking).join(Property).filter(Property.landlord_id == landlord_id).all()
-        print(bookings)
+        query = landlord_rows(Booking, landlord_id)
+        bookings, next_cursor = paginate(LANDLORD_BOOKING_VIEW.select(query, fields), Booking, cursor, limit)
+        serialize = LANDLORD_BOOKING_VIEW.serializer(fields)
         return jsonify({
-            'data': [{
-                'id': b.id,
-                'property_id': b.property_id,
-                'tenant_id': b.tenant_id,
-                'start_date': b.start_date.isoformat() if b.start_date else None,
-                'end_date': b.end_date.isoformat() if b.end_date else None,
-                'status': b.status.value
-            } for b in bookings]
+            'data': [serialize(b) for b in bookings],
+            'next_cursor': next_cursor
         })
     except Exception as e:
         return jsonify({'error': 'Server error'}), 500
 
 @app.route('/api/issues/landlord/<int:landlord_id>', methods=['GET'])
+@conditional(table_versions('issues', 'properties'))
 def get_landlord_issues(landlord_id):
+    cursor, limit = page_args(request.args)
+    fields = LANDLORD_ISSUE_VIEW.fieldset(request.args)
     try:
-        issues = db.session.query(Issue).join(Property).filter(Property.landlord_id == landlord_id).all()
+        query = landlord_rows(Issue, landlord_id)
+        issues, next_cursor = paginate(LANDLORD_ISSUE_VIEW.select(query, fields), Issue, cursor, limit)
+        serialize = LANDLORD_ISSUE_VIEW.serializer(fields)
         return jsonify({
-            'data': [{
-                'id': i.id,
-                'title': i.title,
-                'description': i.description,
-                'status': i.status.value,
-                'priority': i.priority,
-                'property_id': i.property_id,
-                'created_at': i.created_at.isoformat() if i.created_at else None
-            } for i in issues]
+            'data': [serialize(i) for i in issues],
+            'next_cursor': next_cursor
         })
     except Exception as e:
         return jsonify({'error': 'Server error'}), 500
 
+@app.route('/api/landlords/<int:landlord_id>/summary', methods=['GET'])
+def get_landlord_summary(landlord_id):
+    if db.session.get(User, landlord_id) is None:
+        return jsonify({'error': 'Landlord not found'}), 404
+    return jsonify({'success': True, 'summary': landlord_summary(landlord_id)})
+
+@app.route('/api/landlords/<int:landlord_id>/revenue', methods=['GET'])
+def get_landlord_revenue(landlord_id):
+    first_month = request.args.get('from')
+    last_month = request.args.get('to')
+    for month in (first_month, last_month):
+        if month is not None and not re.fullmatch(r'\d{4}-\d{2}', month):
+            return jsonify({'error': 'from and to must be YYYY-MM'}), 400
+    return jsonify({'success': True, 'months': landlord_revenue(landlord_id, first_month, last_month)})
+
+def export_landlord_rows(query, view, filename):
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    return export_response(query, view, view.fieldset(request.args), fmt, filename)
+
+@app.route('/api/payments/landlord/<int:landlord_id>/export', methods=['GET'])
+def export_landlord_payments(landlord_id):
+    query = landlord_rows(Payment, landlord_id)
+    return export_landlord_rows(query, PAYMENT_VIEW, f'payments-landlord-{landlord_id}')
+
+@app.route('/api/bookings/landlord/<int:landlord_id>/export', methods=['GET'])
+def export_landlord_bookings(landlord_id):
+    query = landlord_rows(Booking, landlord_id)
+    return export_landlord_rows(query, BOOKING_VIEW, f'bookings-landlord-{landlord_id}')
+
+@app.route('/api/issues/landlord/<int:landlord_id>/export', methods=['GET'])
+def export_landlord_issues(landlord_id):
+    query = landlord_rows(Issue, landlord_id)
+    return export_landlord_rows(query, LANDLORD_ISSUE_VIEW, f'issues-landlord-{landlord_id}')
+
 @app.route('/api/issues/<int:issue_id>/resolve', methods=['PATCH'])
 def resolve_issue(issue_id):
     try:
@@ -570,14 +823,18 @@ def create_notification():
             property_id=data.get('property_id')
         )
         db.session.add(notification)
-        db.session.commit()
 
-        # Send email notification (mock - log instead of actual send)
-        recipient_email = data.get('email', 'tenant@example.com')
-        logging.info(f"Mock email sent to {recipient_email}: {notification.title} - {notification.message}")
+        # Queue the email; the outbox sender delivers it in the background
+        recipient_email = data.get('email')
+        if not recipient_email:
+            user = db.session.get(User, data['user_id'])
+            recipient_email = user.email if user else None
+        if recipient_email:
+            enqueue_email(recipient_email, notification.title, notification.message)
+        db.session.commit()
 
         return jsonify({
-            'message': 'Notification created and email sent (mock)',
+            'message': 'Notification created and email queued',
             'notification_id': notification.id
         }), 201
 
@@ -0,0 +1,128 @@
+"""Fire many concurrent overlapping bookings at one property.
+
+Checks that no night of the property is won by more than one request and
+that the booking_nights rows match the successful requests. With the default
+one-night stays every requested night is contested, so each must be won by
+exactly one request. Exits non-zero otherwise.
+
+    python benchmarks/booking_stress.py --workers 32 --requests 400
+
+Runs against the configured database; the fixture users and property it
+creates are removed afterwards.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from database import db  # noqa: E402
+from models import Booking, BookingNight, Property, User, UserType  # noqa: E402
+from reservations import nights_between  # noqa: E402
+
+
+def create_fixture():
+    suffix = datetime.utcnow().strftime('%Y%m%d%H%M%S%f')
+    landlord = User(email=f'stress-landlord-{suffix}@example.com', password_hash='-',
+                    first_name='Stress', last_name='Landlord', user_type=UserType.LANDLORD)
+    tenant = User(email=f'stress-tenant-{suffix}@example.com', password_hash='-',
+                  first_name='Stress', last_name='Tenant', user_type=UserType.TENANT)
+    db.session.add_all([landlord, tenant])
+    db.session.flush()
+    prop = Property(title='Stress test unit', address='-', city='Nairobi', rent_amount=1000,
+                    bedrooms=1, bathrooms=1, landlord_id=landlord.id, tenant_id=tenant.id)
+    db.session.add(prop)
+    db.session.commit()
+    return landlord.id, tenant.id, prop.id
+
+
+def drop_fixture(landlord_id, tenant_id, property_id):
+    # Bookings, the property and the users go through the ORM so the rollup
+    # listeners see them leave; bulk deletes would leave the rollups stale
+    BookingNight.query.filter_by(property_id=property_id).delete()
+    for booking in Booking.query.filter_by(property_id=property_id):
+        db.session.delete(booking)
+    db.session.delete(db.session.get(Property, property_id))
+    for user in User.query.filter(User.id.in_([landlord_id, tenant_id])):
+        db.session.delete(user)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--window-days', type=int, default=30)
+    parser.add_argument('--max-nights', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with app.app_context():
+        landlord_id, tenant_id, property_id = create_fixture()
+
+    rng = random.Random(args.seed)
+    base = datetime(2030, 1, 1)
+    stays = []
+    for _ in range(args.requests):
+        start = base + timedelta(days=rng.randrange(args.window_days))
+        stays.append((start, start + timedelta(days=rng.randint(1, args.max_nights))))
+
+    barrier = threading.Barrier(min(args.workers, args.requests))
+
+    def book(stay):
+        client = app.test_client()
+        try:
+            barrier.wait(timeout=10)
+        except threading.BrokenBarrierError:
+            pass
+        response = client.post('/api/bookings', json={
+            'tenant_id': tenant_id,
+            'property_id': property_id,
+            'start_date': stay[0].isoformat(),
+            'end_date': stay[1].isoformat(),
+        })
+        return stay, response.status_code, response.get_json()
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(book, stays))
+
+    failures = []
+    with app.app_context():
+        try:
+            won = Counter()
+            for stay, status, body in results:
+                if status == 201:
+                    won.update(nights_between(*stay))
+            requested = {night for stay in stays for night in nights_between(*stay)}
+            held = Counter(night for (night,) in db.session.query(BookingNight.night)
+                           .filter_by(property_id=property_id))
+
+            for night in sorted(requested):
+                if won[night] > 1 or (args.max_nights == 1 and won[night] != 1):
+                    failures.append(f'{night}: won by {won[night]} requests')
+                if held[night] != won[night]:
+                    failures.append(f'{night}: {held[night]} rows held, {won[night]} won')
+        finally:
+            drop_fixture(landlord_id, tenant_id, property_id)
+
+    statuses = Counter(status for _, status, _ in results)
+    errors = Counter(body.get('error') for _, status, body in results if status != 201)
+    print(f'{args.requests} requests, {args.workers} workers: {dict(statuses)}')
+    for error, count in errors.most_common():
+        print(f'  {count:5d} x {error}')
+    if failures:
+        print('FAILED')
+        for failure in failures:
+            print(f'  {failure}')
+        sys.exit(1)
+    print('OK: no night was won by more than one booking')
+
+
+if __name__ == '__main__':
+    main()
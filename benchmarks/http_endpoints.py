@@ -0,0 +1,286 @@
+"""Drive the API over HTTP and report throughput and latency percentiles per endpoint.
+
+Builds a synthetic dataset in a fresh SQLite database (``flask db upgrade``
+then ``flask generate-data``) and starts the app under gunicorn against it.
+Each endpoint then gets --requests requests from --concurrency client
+threads over keep-alive connections, after a short warm-up:
+
+    python benchmarks/http_endpoints.py --properties 20000 --concurrency 16 --output results.json
+    python benchmarks/http_endpoints.py --database /tmp/bench.db --compare results.json
+
+--database keeps the database at that path and reuses it on later runs.
+--output writes the results as JSON with the commit and settings they came
+from; --compare prints the change in throughput and p95 against such a file.
+Only read endpoints and login are driven, so runs against one database stay
+comparable.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (method, path template, body template); {landlord}, {tenant},
+# {property}, {city} and {term} are filled per request from the dataset
+ENDPOINTS = {
+    'list_properties': ('GET', '/api/properties', None),
+    'filter_properties': ('GET', '/api/properties?city={city}&min_bedrooms=2', None),
+    'search_properties': ('GET', '/api/properties/search?q={term}', None),
+    'available_properties': ('GET', '/api/properties/available?start={start}&end={end}&city={city}', None),
+    'get_property': ('GET', '/api/properties/{property}', None),
+    'list_users': ('GET', '/api/users', None),
+    'list_bookings': ('GET', '/api/bookings', None),
+    'tenant_bookings': ('GET', '/api/bookings?user_type=tenant&user_id={tenant}', None),
+    'list_payments': ('GET', '/api/payments', None),
+    'landlord_payments': ('GET', '/api/payments?user_type=landlord&user_id={landlord}', None),
+    'list_issues': ('GET', '/api/issues', None),
+    'landlord_properties': ('GET', '/api/properties/landlord/{landlord}', None),
+    'landlord_bookings': ('GET', '/api/bookings/landlord/{landlord}', None),
+    'landlord_issues': ('GET', '/api/issues/landlord/{landlord}', None),
+    'landlord_summary': ('GET', '/api/landlords/{landlord}/summary', None),
+    'landlord_revenue': ('GET', '/api/landlords/{landlord}/revenue', None),
+    'export_payments': ('GET', '/api/payments/landlord/{landlord}/export?format=ndjson', None),
+    'login': ('POST', '/api/login', {'email': '{email}', 'password': 'password123'}),
+}
+WARMUP_REQUESTS = 20
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)] * 1000
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def flask(env, *args):
+    subprocess.run([sys.executable, '-m', 'flask', *args], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def prepare_database(args, env):
+    if os.path.exists(args.database):
+        print(f'Reusing {args.database}')
+        return
+    print(f'Generating dataset in {args.database} ...')
+    flask(env, 'db', 'upgrade')
+    flask(env, 'generate-data', '--landlords', str(args.landlords), '--tenants', str(args.tenants),
+          '--properties', str(args.properties), '--seed', str(args.seed))
+
+
+def dataset_params(env):
+    """Ids and values to put in request paths, read through the app's own models."""
+    os.environ.update(env)
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import func
+
+    from app import app
+    from database import db
+    from models import Property, User, UserType
+
+    with app.app_context():
+        # The busiest landlords, where per-landlord endpoints do the most work
+        landlords = [row[0] for row in db.session.query(Property.landlord_id)
+                     .group_by(Property.landlord_id).order_by(func.count().desc()).limit(20)]
+        tenants = db.session.query(User.id, User.email).filter(User.user_type == UserType.TENANT) \
+            .order_by(User.id).limit(200).all()
+        properties = [row[0] for row in db.session.query(Property.id).order_by(Property.id).limit(1000)]
+        cities = [row[0] for row in db.session.query(Property.city).distinct()]
+        terms = [row[0].split()[-1] for row in db.session.query(Property.title).limit(50)]
+    if not (landlords and tenants and properties):
+        sys.exit('The dataset has no landlords, tenants or properties.')
+    return {
+        'landlord': landlords, 'tenant': [row.id for row in tenants], 'email': [row.email for row in tenants],
+        'property': properties, 'city': cities, 'term': terms,
+    }
+
+
+def start_server(args, env, port):
+    command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers),
+               '--threads', str(args.threads), '--worker-class', 'gthread', '--log-level', 'warning', 'app:app']
+    server = subprocess.Popen(command, cwd=ROOT, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/properties?limit=1')
+            connection.getresponse().read()
+            connection.close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                sys.exit('gunicorn exited during startup')
+            time.sleep(0.2)
+    server.terminate()
+    sys.exit('gunicorn did not start within 30s')
+
+
+def fill(template, params, rng):
+    if template is None:
+        return None
+    if isinstance(template, dict):
+        return json.dumps({key: fill(value, params, rng) for key, value in template.items()})
+    start = datetime(2030, 1, 1) + timedelta(days=rng.randrange(365))
+    values = {name: rng.choice(choices) for name, choices in params.items()}
+    values.update(start=start.date().isoformat(), end=(start + timedelta(days=7)).date().isoformat())
+    return template.format(**values)
+
+
+def drive(port, method, path, body, params, count, concurrency):
+    """Send ``count`` requests from ``concurrency`` threads; return latencies, statuses and seconds."""
+    lock = threading.Lock()
+    remaining = [count]
+    latencies = []
+    statuses = {}
+    headers = {'Content-Type': 'application/json'} if body else {}
+
+    def client(seed):
+        rng = random.Random(seed)
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        mine = []
+        codes = {}
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    break
+                remaining[0] -= 1
+            request_path = fill(path, params, rng)
+            request_body = fill(body, params, rng)
+            started = time.perf_counter()
+            try:
+                connection.request(method, request_path, body=request_body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                status = 'error'
+            mine.append(time.perf_counter() - started)
+            codes[status] = codes.get(status, 0) + 1
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            for status, n in codes.items():
+                statuses[status] = statuses.get(status, 0) + n
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), statuses, time.perf_counter() - started
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def compare(results, path):
+    with open(path) as f:
+        baseline = json.load(f)
+    print(f"\nAgainst {path} ({(baseline['meta'].get('commit') or 'unknown')[:10]}):")
+    print(f"{'endpoint':<22} {'req/s was':>9} {'change':>7} {'p95 ms was':>10} {'change':>7}")
+    for name, current in results['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if not before:
+            continue
+        rps = (current['rps'] / before['rps'] - 1) * 100 if before['rps'] else 0
+        p95 = (current['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0
+        print(f"{name:<22} {before['rps']:9.0f} {rps:+6.1f}% {before['p95_ms']:10.1f} {p95:+6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=500, help='per endpoint')
+    parser.add_argument('--endpoints', help=f"comma separated subset of: {', '.join(ENDPOINTS)}")
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='threads per gunicorn worker')
+    parser.add_argument('--database', help='SQLite file to create, or reuse if it exists')
+    parser.add_argument('--landlords', type=int, default=200)
+    parser.add_argument('--tenants', type=int, default=5000)
+    parser.add_argument('--properties', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='results JSON from an earlier run to compare against')
+    args = parser.parse_args()
+
+    names = args.endpoints.split(',') if args.endpoints else list(ENDPOINTS)
+    unknown = set(names) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    directory = tempfile.TemporaryDirectory()
+    args.database = os.path.abspath(args.database or os.path.join(directory.name, 'bench.db'))
+    env = dict(os.environ, FLASK_APP='app.py', DATABASE_URL=f'sqlite:///{args.database}')
+    env.pop('DATABASE_REPLICA_URL', None)
+    prepare_database(args, env)
+    params = dataset_params(env)
+
+    port = free_port()
+    server = start_server(args, env, port)
+    results = {'endpoints': {}}
+    try:
+        print(f"{'endpoint':<22} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for name in names:
+            method, path, body = ENDPOINTS[name]
+            drive(port, method, path, body, params, WARMUP_REQUESTS, min(args.concurrency, WARMUP_REQUESTS))
+            latencies, statuses, elapsed = drive(port, method, path, body, params, args.requests, args.concurrency)
+            errors = sum(n for status, n in statuses.items() if status == 'error' or status >= 400)
+            stats = {
+                'method': method, 'path': path, 'requests': len(latencies), 'errors': errors,
+                'statuses': {str(status): n for status, n in sorted(statuses.items(), key=str)},
+                'seconds': round(elapsed, 3), 'rps': round(len(latencies) / elapsed, 1),
+                'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+                'p50_ms': round(percentile(latencies, 0.50), 2), 'p95_ms': round(percentile(latencies, 0.95), 2),
+                'p99_ms': round(percentile(latencies, 0.99), 2), 'max_ms': round(latencies[-1] * 1000, 2),
+            }
+            results['endpoints'][name] = stats
+            print(f"{name:<22} {stats['rps']:8.0f} {stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} "
+                  f"{stats['p99_ms']:8.1f} {errors:7d}")
+    finally:
+        server.terminate()
+        server.wait()
+        directory.cleanup()
+
+    commit, dirty = git_commit()
+    results['meta'] = {
+        'commit': commit, 'dirty': dirty, 'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': platform.python_version(), 'platform': platform.platform(),
+        'concurrency': args.concurrency, 'requests_per_endpoint': args.requests,
+        'server': {'workers': args.workers, 'threads': args.threads},
+        'dataset': {'landlords': args.landlords, 'tenants': args.tenants, 'properties': args.properties,
+                    'seed': args.seed},
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nResults written to {args.output}')
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Measure GET /api/properties latency while logins hammer the server.
+
+Starts the app once per --hash-workers value, measures read latency alone
+and then with --login-threads clients logging in back to back, and prints
+p50/p99 for both. Compare PASSWORD_HASH_WORKERS=0 (hashing on the request
+threads) with a process pool:
+
+    python benchmarks/login_contention.py --hash-workers 0,4
+
+Runs against the configured database and registers a benchmark user if
+it is missing.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EMAIL = 'bench-login@example.com'
+PASSWORD = 'bench-password'
+
+
+def request(url, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def start_server(port, hash_workers):
+    env = dict(os.environ, PASSWORD_HASH_WORKERS=str(hash_workers))
+    server = subprocess.Popen(
+        [sys.executable, '-c',
+         f'from app import app; app.run(port={port}, threaded=True, use_reloader=False)'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            request(f'{base}/api/properties?limit=1')
+            return server, base
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError('server did not start')
+
+
+def read_latencies(base, duration):
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        request(f'{base}/api/properties?limit=20')
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run(hash_workers, args):
+    server, base = start_server(args.port, hash_workers)
+    try:
+        request(f'{base}/api/register', {
+            'email': EMAIL, 'password': PASSWORD, 'first_name': 'Bench',
+            'last_name': 'Login', 'user_type': 'TENANT'})
+        idle = read_latencies(base, args.duration)
+
+        stop = threading.Event()
+        statuses = []
+
+        def hammer():
+            while not stop.is_set():
+                statuses.append(request(f'{base}/api/login', {'email': EMAIL, 'password': PASSWORD}))
+
+        threads = [threading.Thread(target=hammer) for _ in range(args.login_threads)]
+        for thread in threads:
+            thread.start()
+        loaded = read_latencies(base, args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    logins = {code: statuses.count(code) for code in sorted(set(statuses))}
+    print(f'hash workers {hash_workers}:')
+    print(f'  idle      p50 {percentile(idle, 50):7.1f} ms  p99 {percentile(idle, 99):7.1f} ms  ({len(idle)} reads)')
+    print(f'  logins    p50 {percentile(loaded, 50):7.1f} ms  p99 {percentile(loaded, 99):7.1f} ms  ({len(loaded)} reads)')
+    print(f'  login responses: {logins} in {args.duration:.0f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hash-workers', default='0,4',
+                        help='comma-separated PASSWORD_HASH_WORKERS values to compare')
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+    for hash_workers in args.hash_workers.split(','):
+        run(int(hash_workers), args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Compare the property list encoding path before and after compiled serializers.
+
+Serializes --rows transient Property objects with ``to_dict(only=...)`` and
+the stdlib encoder, then with ``serialize_property`` and the orjson-backed
+provider, and prints the best of --repeat runs for each:
+
+    python benchmarks/serializers.py --rows 200
+
+Needs no database; the rows are never added to a session.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app import app  # noqa: E402
+from models import Property, PropertyStatus  # noqa: E402
+from serializers import PROPERTY_FIELDS, serialize_property  # noqa: E402
+
+
+def make_rows(count):
+    return [Property(
+        id=i, title=f'Property {i}', description='Two bedroom flat near the market',
+        rent_amount=Decimal('25000.00') + i, address=f'{i} Moi Avenue', city='Nairobi',
+        bedrooms=2, bathrooms=1, url='https://example.com/p.jpg', type='apartment',
+        area_sqft=850, status=PropertyStatus.AVAILABLE, created_at=datetime(2024, 1, 1),
+    ) for i in range(count)]
+
+
+def best(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    default_json = DefaultJSONProvider(app)
+
+    def before():
+        return default_json.dumps({'success': True, 'properties': [p.to_dict(only=PROPERTY_FIELDS) for p in rows]})
+
+    def after():
+        return app.json.dumps({'success': True, 'properties': [serialize_property(p) for p in rows]})
+
+    with app.app_context():
+        if json.loads(before()) != json.loads(after()):
+            sys.exit('serializer output differs from to_dict')
+        old, new = best(before, args.repeat), best(after, args.repeat)
+    print(f'{args.rows} rows, best of {args.repeat}:')
+    print(f'  to_dict + json      {old:8.2f} ms')
+    print(f'  compiled + orjson   {new:8.2f} ms  ({old / new:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Compare mixed read/write throughput with SQLite's defaults and the tuned PRAGMAs.
+
+Copies the configured database to a temporary file, then runs the same
+workload against the copy once per profile: --readers threads page through
+properties by city while --writers threads update single properties, each
+write in its own transaction, for --seconds:
+
+    python benchmarks/sqlite_concurrency.py --readers 8 --writers 2 --seconds 10
+
+The "default" profile is how the app connected before (rollback journal,
+full sync, the driver's 5 s lock wait); "tuned" is database.SQLITE_PRAGMAS,
+so SQLITE_* environment variables apply. Reads, writes, "database is
+locked" errors and p95 latencies are printed per profile. The configured
+database itself is only read.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from database import SQLITE_PRAGMAS, apply_sqlite_pragmas, db  # noqa: E402
+
+READ_SQL = ('SELECT id, title, city, rent_amount, status FROM properties '
+            'WHERE city = ? AND id > ? ORDER BY id LIMIT 20')
+WRITE_SQL = 'UPDATE properties SET updated_at = ? WHERE id = ?'
+
+
+def p95(samples):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[int(len(samples) * 0.95)] * 1000
+
+
+def run_profile(path, pragmas, args, property_ids, cities):
+    # Start each profile from a rollback-journal file: WAL persists in the
+    # database header once set
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode = DELETE')
+    connection.close()
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    totals = {'reads': 0, 'writes': 0, 'locked': 0, 'read_times': [], 'write_times': []}
+
+    def worker(write, seed):
+        rng = random.Random(seed)
+        connection = sqlite3.connect(path, check_same_thread=False)
+        apply_sqlite_pragmas(connection, pragmas)
+        done = locked = 0
+        times = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                if write:
+                    connection.execute(WRITE_SQL, (datetime.utcnow(), rng.choice(property_ids)))
+                    connection.commit()
+                else:
+                    connection.execute(READ_SQL, (rng.choice(cities), rng.choice(property_ids))).fetchall()
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e):
+                    raise
+                connection.rollback()
+                locked += 1
+                continue
+            times.append(time.perf_counter() - started)
+            done += 1
+        connection.close()
+        with lock:
+            totals['writes' if write else 'reads'] += done
+            totals['locked'] += locked
+            totals['write_times' if write else 'read_times'].extend(times)
+
+    threads = [threading.Thread(target=worker, args=(False, i)) for i in range(args.readers)]
+    threads += [threading.Thread(target=worker, args=(True, 1000 + i)) for i in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            sys.exit('This benchmark compares SQLite settings; the configured database is not SQLite.')
+        source = db.engine.url.database
+        db.engine.dispose()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'concurrency.db')
+        # Backup rather than copy, so a live WAL database is captured consistently
+        with sqlite3.connect(source) as original, sqlite3.connect(path) as copy:
+            original.backup(copy)
+        connection = sqlite3.connect(path)
+        property_ids = [row[0] for row in connection.execute('SELECT id FROM properties')]
+        cities = [row[0] for row in connection.execute('SELECT DISTINCT city FROM properties')]
+        connection.close()
+        if not property_ids:
+            sys.exit('No properties to work with; seed the database first.')
+
+        print(f'{args.readers} readers, {args.writers} writers, {args.seconds:g}s per profile, '
+              f'{len(property_ids)} properties')
+        for name, pragmas in (('default', []), ('tuned', SQLITE_PRAGMAS)):
+            totals = run_profile(path, pragmas, args, property_ids, cities)
+            print(f"{name:>8}: {totals['reads'] / args.seconds:9.0f} reads/s "
+                  f"{totals['writes'] / args.seconds:8.0f} writes/s "
+                  f"{totals['locked']:6d} locked  "
+                  f"p95 read {p95(totals['read_times']):6.2f} ms  write {p95(totals['write_times']):7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,148 @@
+import os
+import sqlite3
+
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm.context import FromStatement
+from sqlalchemy.sql.elements import TextClause
+
+# SQLALCHEMY_BINDS key of the read replica, when one is configured
+REPLICA_BIND = 'replica'
+
+
+def _is_read(clause):
+    if isinstance(clause, FromStatement):
+        clause = clause.element
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip()[:6].upper() == 'SELECT'
+    return bool(getattr(clause, 'is_select', False))
+
+
+class RoutingSession(Session):
+    """Session that sends SELECTs to the read replica when the request allows it.
+
+    ``replicas.py`` decides per request by setting ``g.use_replica``. Only
+    SELECT statements outside a flush are routed; writes, flushes and bare
+    ``session.connection()`` calls always use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and has_app_context() and g.get('use_replica')
+                and _is_read(clause)):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+_TRUE = ('1', 'true', 'yes', 'on')
+
+
+def database_url(default, environ=os.environ):
+    """The database URL from ``DATABASE_URL`` (or ``SQLALCHEMY_DATABASE_URI``).
+
+    Falls back to ``default``. ``postgres://`` URLs, as some hosts hand them
+    out, are rewritten to the ``postgresql://`` scheme SQLAlchemy expects.
+    """
+    url = environ.get('DATABASE_URL') or environ.get('SQLALCHEMY_DATABASE_URI') or default
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url, environ=os.environ):
+    """``SQLALCHEMY_ENGINE_OPTIONS`` for ``url``, tuned from ``DB_POOL_*`` variables.
+
+    Each process keeps up to ``DB_POOL_SIZE`` connections open and opens
+    ``DB_MAX_OVERFLOW`` more under bursts; a request waits up to
+    ``DB_POOL_TIMEOUT`` seconds for one before failing. Connections are
+    replaced after ``DB_POOL_RECYCLE`` seconds and, with ``DB_POOL_PRE_PING``,
+    tested before use, so ones dropped by the server or a proxy are never
+    handed out. In-memory SQLite has a single shared connection and takes
+    no pool settings.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {}
+    try:
+        return {
+            'pool_size': int(environ.get('DB_POOL_SIZE', '10')),
+            'max_overflow': int(environ.get('DB_MAX_OVERFLOW', '20')),
+            'pool_timeout': float(environ.get('DB_POOL_TIMEOUT', '30')),
+            'pool_recycle': int(environ.get('DB_POOL_RECYCLE', '1800')),
+            'pool_pre_ping': environ.get('DB_POOL_PRE_PING', 'true').strip().lower() in _TRUE,
+        }
+    except ValueError as e:
+        raise ValueError(f'Invalid DB_POOL_* setting: {e}')
+
+
+_SQLITE_CHOICES = {
+    'journal_mode': {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'},
+    'synchronous': {'OFF', 'NORMAL', 'FULL', 'EXTRA'},
+    'temp_store': {'DEFAULT', 'FILE', 'MEMORY'},
+}
+
+
+def sqlite_pragmas(environ=os.environ):
+    """The PRAGMAs run on every new SQLite connection, in order.
+
+    WAL lets readers carry on while a write is in progress, and with it
+    ``synchronous=NORMAL`` only syncs at checkpoints instead of on every
+    commit. ``busy_timeout`` makes a writer wait for the lock rather than
+    fail straight away with "database is locked". Each value can be
+    overridden with the matching ``SQLITE_*`` environment variable; an
+    empty value leaves SQLite's own default in place.
+    """
+    settings = [
+        ('journal_mode', environ.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('busy_timeout', environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        ('synchronous', environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('mmap_size', environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+        # Negative sizes are in KiB rather than pages
+        ('cache_size', environ.get('SQLITE_CACHE_SIZE', '-20000')),
+        ('temp_store', environ.get('SQLITE_TEMP_STORE', 'MEMORY')),
+    ]
+    pragmas = []
+    for name, value in settings:
+        value = value.strip().upper()
+        if not value:
+            continue
+        if name in _SQLITE_CHOICES:
+            if value not in _SQLITE_CHOICES[name]:
+                raise ValueError(f"SQLite {name} must be one of: {', '.join(sorted(_SQLITE_CHOICES[name]))}")
+        else:
+            try:
+                value = str(int(value))
+            except ValueError:
+                raise ValueError(f'SQLite {name} must be an integer')
+        pragmas.append((name, value))
+    return pragmas
+
+
+SQLITE_PRAGMAS = sqlite_pragmas()
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas=None):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS if pragmas is None else pragmas:
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, 'connect')
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        apply_sqlite_pragmas(dbapi_connection)
+
 
-db = SQLAlchemy()
+def dialect_insert(connection):
+    """The ``insert`` construct with ON CONFLICT support for ``connection``'s database."""
+    return postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
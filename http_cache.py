@@ -0,0 +1,94 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from flask import make_response, request
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from database import db
+from models import ResourceVersion
+
+# Tables with a row in resource_versions
+VERSIONED_TABLES = frozenset(['users', 'properties', 'bookings', 'payments', 'issues'])
+
+
+def _bump(connection, tables):
+    tables = VERSIONED_TABLES.intersection(tables)
+    if tables:
+        connection.execute(
+            update(ResourceVersion.__table__)
+            .where(ResourceVersion.__table__.c.name.in_(sorted(tables)))
+            .values(version=ResourceVersion.__table__.c.version + 1, updated_at=datetime.utcnow())
+        )
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_tables(session, flush_context):
+    tables = {obj.__table__.name for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+              if hasattr(obj, '__table__')}
+    _bump(session.connection(), tables)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_bulk_tables(orm_execute_state):
+    # session.execute(insert(Model), rows) and Query.update()/delete() skip the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _bump(orm_execute_state.session.connection(), {orm_execute_state.statement.table.name})
+
+
+def table_versions(*tables):
+    """Validator source for collection routes: the versions of ``tables``."""
+    def validators(**view_args):
+        rows = db.session.query(ResourceVersion.name, ResourceVersion.version, ResourceVersion.updated_at) \
+            .filter(ResourceVersion.name.in_(tables)).order_by(ResourceVersion.name).all()
+        version = ','.join(f'{row.name}:{row.version}' for row in rows)
+        return version, max((row.updated_at for row in rows), default=None)
+    return validators
+
+
+def row_version(model, arg):
+    """Validator source for single-row routes: the row's ``updated_at``."""
+    def validators(**view_args):
+        updated_at = db.session.query(model.updated_at).filter(model.id == view_args[arg]).scalar()
+        if updated_at is None:
+            return None, None
+        return updated_at.isoformat(), updated_at
+    return validators
+
+
+def conditional(validators):
+    """Answer conditional GETs before running the view.
+
+    ``validators`` cheaply computes a version string and last-modified time
+    for the resource. The ETag hashes that version with the full request
+    path, so each page and filter combination gets its own tag. When the
+    client's ``If-None-Match`` (or, failing that, ``If-Modified-Since``)
+    still matches, a body-less 304 is returned and the view never runs.
+    """
+    def decorator(view):
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            version, last_modified = validators(**kwargs)
+            if version is None:
+                return view(*args, **kwargs)
+            etag = hashlib.sha1(f'{request.full_path}|{version}'.encode()).hexdigest()[:20]
+            if last_modified is not None:
+                last_modified = last_modified.replace(microsecond=0)
+
+            if request.if_none_match:
+                fresh = request.if_none_match.contains(etag)
+            elif request.if_modified_since and last_modified is not None:
+                fresh = last_modified <= request.if_modified_since.replace(tzinfo=None)
+            else:
+                fresh = False
+
+            response = make_response('', 304) if fresh else make_response(view(*args, **kwargs))
+            if response.status_code in (200, 304):
+                response.set_etag(etag)
+                if last_modified is not None:
+                    response.last_modified = last_modified
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return decorated
+    return decorator
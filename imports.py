@@ -0,0 +1,178 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models import Property, PropertyStatus, User
+from rollups import record_bulk_insert
+from search import deferred_property_index
+
+# Rows written per INSERT ... VALUES batch and per transaction
+IMPORT_CHUNK_SIZE = 2000
+# Errors listed in the result; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_COLUMNS = ('title', 'address', 'city', 'rent_amount', 'landlord_id')
+
+
+def _integer(values, name, default=None, minimum=0):
+    value = values.get(name)
+    if value is None or value == '':
+        return default
+    # int() would truncate a JSON 2.5 to 2
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f'{name} must be an integer')
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an integer')
+    if number < minimum:
+        raise ValueError(f'{name} must be at least {minimum}')
+    return number
+
+
+def _text(values, name, max_length):
+    value = values.get(name)
+    if value is None or value == '':
+        return None
+    value = str(value).strip()
+    if len(value) > max_length:
+        raise ValueError(f'{name} must be at most {max_length} characters')
+    return value
+
+
+def property_row(values):
+    """Validate one imported property and return the column values to insert.
+
+    Accepts a dict from JSON or a CSV row (where every value is a string) and
+    raises ``ValueError`` describing the first problem found.
+    """
+    if not isinstance(values, dict):
+        raise ValueError('row must be an object')
+    missing = [name for name in REQUIRED_COLUMNS if values.get(name) in (None, '')]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    try:
+        rent_amount = Decimal(str(values['rent_amount']))
+    except InvalidOperation:
+        raise ValueError('rent_amount must be a number')
+    if not rent_amount.is_finite() or rent_amount <= 0:
+        raise ValueError('rent_amount must be positive')
+    try:
+        status = PropertyStatus(values.get('status') or PropertyStatus.AVAILABLE.value)
+    except ValueError:
+        raise ValueError(f"status must be one of: {', '.join(s.value for s in PropertyStatus)}")
+
+    now = datetime.utcnow()
+    return {
+        'title': _text(values, 'title', 200),
+        'description': _text(values, 'description', 100000) or '',
+        'address': _text(values, 'address', 300),
+        'city': _text(values, 'city', 100),
+        'rent_amount': rent_amount.quantize(Decimal('0.01')),
+        'bedrooms': _integer(values, 'bedrooms', 1),
+        'bathrooms': _integer(values, 'bathrooms', 1),
+        'area_sqft': _integer(values, 'area_sqft', 0),
+        'url': _text(values, 'url', 500) or '',
+        'type': _text(values, 'type', 50),
+        'status': status,
+        'landlord_id': _integer(values, 'landlord_id', minimum=1),
+        'tenant_id': _integer(values, 'tenant_id', minimum=1),
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+class ImportResult:
+    """Outcome of an import: rows written, and the rows rejected with why."""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def reject(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'error': message})
+
+    def to_dict(self):
+        errors = sorted(self.errors, key=lambda error: error['row'])
+        return {'imported': self.imported, 'failed': self.failed, 'errors': errors}
+
+
+def _write_chunk(chunk, result, defer_index):
+    # chunk is a list of (row number, values)
+    landlord_ids = {values['landlord_id'] for _, values in chunk}
+    known = {row.id for row in db.session.query(User.id).filter(User.id.in_(landlord_ids))}
+    rows = []
+    for row_number, values in chunk:
+        if values['landlord_id'] in known:
+            rows.append((row_number, values))
+        else:
+            result.reject(row_number, f"landlord_id {values['landlord_id']} does not exist")
+    if not rows:
+        return
+
+    # Core insert on the table: one executemany, without the ORM bulk path's
+    # per-row bookkeeping
+    try:
+        if defer_index:
+            # Offline loads index the chunk in one pass rather than per row
+            with deferred_property_index() as new_ids:
+                new_ids.extend(db.session.execute(
+                    insert(Property.__table__).returning(Property.__table__.c.id),
+                    [values for _, values in rows]).scalars())
+        else:
+            db.session.execute(insert(Property.__table__), [values for _, values in rows])
+        record_bulk_insert(db.session, Property, [values for _, values in rows])
+        db.session.commit()
+        result.imported += len(rows)
+        return
+    except IntegrityError:
+        db.session.rollback()
+
+    # Something in the batch violates a constraint: retry row by row so only
+    # the offending rows are rejected
+    for row_number, values in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Property.__table__), [values])
+                record_bulk_insert(db.session, Property, [values])
+            result.imported += 1
+        except IntegrityError as e:
+            result.reject(row_number, str(e.orig))
+    db.session.commit()
+
+
+def import_properties(rows, chunk_size=IMPORT_CHUNK_SIZE, result=None, defer_index=False):
+    """Validate and insert ``rows`` (any iterable of dicts) in chunks.
+
+    Each chunk of valid rows is one multi-row INSERT and one commit, so a
+    large import costs ``len(rows) / chunk_size`` transactions rather than
+    one per property. Invalid rows are recorded in the result and skipped;
+    they never abort the rest of the import. Rows are numbered from 1.
+
+    Pass ``result`` to keep the counts for chunks already committed if
+    reading ``rows`` itself fails part way through.
+
+    ``defer_index`` indexes each chunk for search in one pass instead of per
+    row (see ``search.deferred_property_index``). It changes the schema, so
+    only offline loads such as ``flask import-properties`` should set it.
+    """
+    result = ImportResult() if result is None else result
+    chunk = []
+    for row_number, values in enumerate(rows, start=1):
+        try:
+            chunk.append((row_number, property_row(values)))
+        except ValueError as e:
+            result.reject(row_number, str(e))
+            continue
+        if len(chunk) >= chunk_size:
+            _write_chunk(chunk, result, defer_index)
+            chunk = []
+    if chunk:
+        _write_chunk(chunk, result, defer_index)
+    return result
@@ -0,0 +1,107 @@
+import calendar
+import logging
+import time
+from datetime import datetime, timedelta
+
+from database import db, dialect_insert
+from models import Booking, BookingStatus, JobCheckpoint, Payment, PaymentStatus, Property
+
+# Bookings invoiced per INSERT and per transaction
+INVOICE_CHUNK_SIZE = 1000
+INVOICE_JOB = 'generate_invoices'
+
+
+def billing_period(when):
+    return when.strftime('%Y-%m')
+
+
+def period_bounds(period):
+    """First instant of ``period`` (YYYY-MM) and of the month after it."""
+    first = datetime.strptime(period, '%Y-%m')
+    return first, (first + timedelta(days=32)).replace(day=1)
+
+
+def invoice_due_date(start_date, period_start):
+    """Rent falls due on the booking's start day each month, or on the last
+    day of months too short to have it."""
+    last_day = calendar.monthrange(period_start.year, period_start.month)[1]
+    return period_start.replace(day=min(start_date.day, last_day))
+
+
+def invoice_candidates(period_start, period_end, after_id, limit):
+    """The next ``limit`` confirmed bookings after ``after_id`` that overlap the period.
+
+    Walks ``ix_bookings_status_id`` in id order, so each chunk starts where
+    the previous one stopped instead of re-reading earlier bookings.
+    """
+    return db.session.query(
+        Booking.id, Booking.tenant_id, Booking.property_id, Booking.start_date, Property.rent_amount,
+    ).join(Property).filter(
+        Booking.status == BookingStatus.CONFIRMED,
+        Booking.id > after_id,
+        Booking.start_date < period_end,
+        # The check-out day is not a night, so a stay ending on the 1st is not billed for that month
+        Booking.end_date > period_start,
+    ).order_by(Booking.id).limit(limit)
+
+
+def _checkpoint(period):
+    checkpoint = db.session.get(JobCheckpoint, INVOICE_JOB)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=INVOICE_JOB, period=period, position=0)
+        db.session.add(checkpoint)
+    elif checkpoint.period != period or checkpoint.completed_at is not None:
+        # Only an interrupted run of the same period is resumed; a finished
+        # one is scanned again from the start to pick up new bookings
+        checkpoint.period = period
+        checkpoint.position = 0
+        checkpoint.completed_at = None
+    db.session.commit()
+    return checkpoint
+
+
+def generate_invoices(period, chunk_size=INVOICE_CHUNK_SIZE):
+    """Create the PENDING rent payment for ``period`` of every confirmed booking.
+
+    Bookings are processed ``chunk_size`` at a time. Each chunk is one
+    multi-row INSERT ... ON CONFLICT DO NOTHING on the (booking_id, period)
+    key plus a checkpoint update, committed together, so reruns never
+    duplicate an invoice and a run that dies part way resumes after the
+    last committed chunk. Returns ``(created, bookings_seen)``.
+    """
+    period_start, period_end = period_bounds(period)
+    checkpoint = _checkpoint(period)
+    stmt = dialect_insert(db.session.connection())(Payment.__table__) \
+        .on_conflict_do_nothing(index_elements=['booking_id', 'period'])
+    created = seen = 0
+    while True:
+        started = time.perf_counter()
+        rows = invoice_candidates(period_start, period_end, checkpoint.position, chunk_size).all()
+        if not rows:
+            break
+        now = datetime.utcnow()
+        result = db.session.execute(stmt, [{
+            'booking_id': row.id,
+            'period': period,
+            'user_id': row.tenant_id,
+            'property_id': row.property_id,
+            'amount': row.rent_amount,
+            'due_date': invoice_due_date(row.start_date, period_start),
+            'status': PaymentStatus.PENDING,
+            'notes': f'Rent for {period}',
+            'created_at': now,
+            'updated_at': now,
+        } for row in rows])
+        # New invoices are PENDING, which the revenue rollup doesn't count,
+        # so the bulk insert needs no rollup bookkeeping
+        checkpoint.position = rows[-1].id
+        db.session.commit()
+        created += result.rowcount
+        seen += len(rows)
+        logging.info(f"Invoices {period}: {result.rowcount} created for {len(rows)} bookings up to id "
+                     f"{checkpoint.position} in {time.perf_counter() - started:.3f}s")
+        if len(rows) < chunk_size:
+            break
+    checkpoint.completed_at = datetime.utcnow()
+    db.session.commit()
+    return created, seen
@@ -0,0 +1,88 @@
+import logging
+import os
+import socket
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from database import db
+from metrics import track_job
+from models import JobLease
+
+# Identifies this process as a lease owner
+OWNER = f'{socket.gethostname()}:{os.getpid()}'
+
+
+def acquire_lease(name, ttl, owner=OWNER):
+    """Try to take the lease on job ``name`` for ``ttl``; return True on success.
+
+    Taking a free lease is a single INSERT, and taking an expired (or our own)
+    lease a single conditional UPDATE, so two processes racing for the same
+    lease cannot both win.
+    """
+    now = datetime.utcnow()
+    try:
+        db.session.add(JobLease(name=name, owner=owner, expires_at=now + ttl))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()
+
+    taken = JobLease.query.filter(
+        JobLease.name == name,
+        db.or_(JobLease.expires_at < now, JobLease.owner == owner),
+    ).update({'owner': owner, 'expires_at': now + ttl}, synchronize_session=False)
+    db.session.commit()
+    return taken == 1
+
+
+def renew_lease(name, ttl, owner=OWNER):
+    """Push our lease on ``name`` out to ``ttl`` from now.
+
+    For jobs that can outrun their lease: call between units of work and
+    stop if this returns False, meaning another worker has taken the lease.
+    """
+    renewed = JobLease.query.filter_by(name=name, owner=owner).update(
+        {'expires_at': datetime.utcnow() + ttl}, synchronize_session=False)
+    db.session.commit()
+    return renewed == 1
+
+
+def release_lease(name, owner=OWNER):
+    JobLease.query.filter_by(name=name, owner=owner).update(
+        {'expires_at': datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+
+
+def run_exclusive(app, name, job, ttl, release=True):
+    """Run ``job`` only if this process holds the lease on ``name``.
+
+    ``ttl`` must comfortably exceed the job's run time. With ``release=False``
+    the lease is kept until it expires, so workers that wake up for the same
+    slot a little later (e.g. the 09:00 run) skip it instead of repeating it.
+    Runs that got the lease are timed into the ``job_*`` metrics. A database
+    error while taking or releasing the lease is logged and the run skipped,
+    so it never stops the scheduler loop.
+    """
+    with app.app_context():
+        try:
+            acquired = acquire_lease(name, ttl)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logging.error(f"Skipping {name}: could not take the lease: {str(e)}")
+            return
+        if not acquired:
+            logging.info(f"Skipping {name}: lease held by another worker")
+            return
+    try:
+        with track_job(name):
+            job()
+    finally:
+        if release:
+            with app.app_context():
+                try:
+                    release_lease(name)
+                except SQLAlchemyError as e:
+                    # The lease then runs out at its expiry instead
+                    db.session.rollback()
+                    logging.error(f"Could not release the lease on {name}: {str(e)}")
@@ -0,0 +1,54 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed.
+
+    Keys are sorted, and datetimes, Decimals and other non-JSON types are
+    formatted by Flask's own ``default`` hook. Anything orjson would write
+    differently goes through the default provider instead: bodies with
+    non-ASCII text while ``ensure_ascii`` is set, integers wider than 64
+    bits, pretty-printed debug responses and calls with extra ``json.dumps``
+    arguments. What remains different: float NaN and Infinity become
+    ``null`` rather than the non-standard ``NaN`` and ``Infinity``, and
+    ``dumps`` writes compact separators, as responses already do.
+    """
+
+    def _options(self):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def _encode(self, obj, options):
+        # None when the default provider has to encode obj
+        try:
+            body = orjson.dumps(obj, default=self.default, option=options)
+        except orjson.JSONEncodeError:
+            # Integers wider than 64 bits, or a type neither orjson nor
+            # ``default`` handles; the default provider encodes the first
+            # and raises the usual TypeError for the second
+            return None
+        if self.ensure_ascii and not body.isascii():
+            return None
+        return body
+
+    def dumps(self, obj, **kwargs):
+        body = None if orjson is None or kwargs else self._encode(obj, self._options())
+        if body is None:
+            return super().dumps(obj, **kwargs)
+        return body.decode()
+
+    def response(self, *args, **kwargs):
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._encode(obj, self._options() | orjson.OPT_APPEND_NEWLINE)
+        if body is None:
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,137 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess, start_http_server
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+METRICS_PATH = '/metrics'
+
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+# Jobs run for anything between milliseconds and an hour
+JOB_DURATION_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Wall time of HTTP requests.', ['method', 'route', 'status'])
+REQUEST_SQL_QUERIES = Histogram(
+    'http_request_sql_queries', 'SQL statements executed per HTTP request.', ['method', 'route'],
+    buckets=QUERY_COUNT_BUCKETS)
+REQUEST_SQL_DURATION = Histogram(
+    'http_request_sql_duration_seconds', 'Time per HTTP request spent executing SQL.', ['method', 'route'])
+JOB_DURATION = Histogram(
+    'job_duration_seconds', 'Wall time of scheduled job runs.', ['job'], buckets=JOB_DURATION_BUCKETS)
+JOB_SQL_QUERIES = Histogram(
+    'job_sql_queries', 'SQL statements executed per scheduled job run.', ['job'],
+    buckets=QUERY_COUNT_BUCKETS + (10000, 100000))
+JOB_SQL_DURATION = Histogram(
+    'job_sql_duration_seconds', 'Time per scheduled job run spent executing SQL.', ['job'],
+    buckets=JOB_DURATION_BUCKETS)
+# Counters rather than a collector over PrincipalCache.stats(), so the
+# totals add up across gunicorn workers
+PRINCIPAL_CACHE_LOOKUPS = Counter(
+    'principal_cache_lookups', 'Authenticated principal cache lookups.', ['result'])
+
+
+class SQLStats:
+    """Statements run and time spent in the database by one request or job."""
+
+    __slots__ = ('queries', 'seconds', 'started')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.started = 0.0
+
+
+# Set while a request or job is being measured; statements run outside one
+# (CLI commands, migrations) are not counted
+_sql_stats = ContextVar('sql_stats', default=None)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _sql_stats.get()
+    if stats is not None:
+        stats.started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _sql_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += time.perf_counter() - stats.started
+
+
+def _registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    # Each gunicorn worker writes its samples to this directory; a scrape
+    # can land on any worker, so it reads them all
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def init_metrics(app):
+    """Record per-route wall time, SQL statement count and SQL time, and serve ``/metrics``.
+
+    Routes are labelled by their URL rule (``/api/properties/<int:property_id>``),
+    not the path, so the number of series stays fixed. Requests that match
+    no route share the label ``unmatched``.
+    """
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.metrics_sql = SQLStats()
+        _sql_stats.set(g.metrics_sql)
+
+    @app.after_request
+    def note_response_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    # Observed at teardown rather than in after_request: for a streamed
+    # response (stream_with_context) teardown waits until the body has been
+    # sent, so the export routes' queries are counted
+    @app.teardown_request
+    def record_request_metrics(exc):
+        sql = g.pop('metrics_sql', None)
+        if sql is None:
+            return
+        _sql_stats.set(None)
+        if request.path == METRICS_PATH:
+            return
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        status = g.pop('metrics_status', 500)
+        REQUEST_DURATION.labels(request.method, route, status).observe(time.perf_counter() - g.metrics_started)
+        REQUEST_SQL_QUERIES.labels(request.method, route).observe(sql.queries)
+        REQUEST_SQL_DURATION.labels(request.method, route).observe(sql.seconds)
+
+    @app.route(METRICS_PATH)
+    def metrics():
+        return generate_latest(_registry()), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+
+@contextmanager
+def track_job(name):
+    """Record the wall time, SQL statement count and SQL time of one job run."""
+    sql = SQLStats()
+    token = _sql_stats.set(sql)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        JOB_DURATION.labels(name).observe(time.perf_counter() - started)
+        JOB_SQL_QUERIES.labels(name).observe(sql.queries)
+        JOB_SQL_DURATION.labels(name).observe(sql.seconds)
+        _sql_stats.reset(token)
+
+
+def start_metrics_server(port):
+    """Serve ``/metrics`` from a background thread, for processes without a web app."""
+    start_http_server(port, registry=_registry())
@@ -0,0 +1,63 @@
+"""adds property full text index
+
+Revision ID: ad6f4984f0f0
+Revises: 870e4c6996f7
+Create Date: 2025-11-05 09:48:22.730561
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ad6f4984f0f0'
+down_revision = '870e4c6996f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is SQLite only; other backends fall back to no full-text index
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    # External-content table: the text lives in `properties`, the FTS table
+    # only stores the inverted index and is kept in sync by the triggers below
+    op.execute("""
+        CREATE VIRTUAL TABLE properties_fts USING fts5(
+            title, description, address, city,
+            content='properties', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER properties_fts_ai AFTER INSERT ON properties BEGIN
+            INSERT INTO properties_fts(rowid, title, description, address, city)
+            VALUES (new.id, new.title, new.description, new.address, new.city);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER properties_fts_ad AFTER DELETE ON properties BEGIN
+            INSERT INTO properties_fts(properties_fts, rowid, title, description, address, city)
+            VALUES ('delete', old.id, old.title, old.description, old.address, old.city);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER properties_fts_au AFTER UPDATE OF title, description, address, city ON properties BEGIN
+            INSERT INTO properties_fts(properties_fts, rowid, title, description, address, city)
+            VALUES ('delete', old.id, old.title, old.description, old.address, old.city);
+            INSERT INTO properties_fts(rowid, title, description, address, city)
+            VALUES (new.id, new.title, new.description, new.address, new.city);
+        END
+    """)
+    op.execute("INSERT INTO properties_fts(properties_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS properties_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS properties_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS properties_fts_ai")
+    op.execute("DROP TABLE IF EXISTS properties_fts")
@@ -45,12 +45,20 @@ class BookingStatus(Enum):
     CONFIRMED = "confirmed"
     CANCELLED = "cancelled"
 
+class OutboxStatus(Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+
 class User(db.Model, SerializerMixin):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
     phone = db.Column(db.String(20))
@@ -74,6 +82,14 @@ class User(db.Model, SerializerMixin):
 
 class Property(db.Model, SerializerMixin):
     __tablename__ = 'properties'
+    __table_args__ = (
+        db.Index('ix_properties_created_at_id', 'created_at', 'id'),
+        db.Index('ix_properties_landlord_id_created_at_id', 'landlord_id', 'created_at', 'id'),
+        db.Index('ix_properties_tenant_id', 'tenant_id'),
+        db.Index('ix_properties_city_status_rent_amount', 'city', 'status', 'rent_amount'),
+        db.Index('ix_properties_type_status_rent_amount', 'type', 'status', 'rent_amount'),
+        db.Index('ix_properties_status_rent_amount', 'status', 'rent_amount'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -100,6 +116,13 @@ class Property(db.Model, SerializerMixin):
 
 class Payment(db.Model, SerializerMixin):
     __tablename__ = 'payments'
+    __table_args__ = (
+        db.Index('ix_payments_created_at_id', 'created_at', 'id'),
+        db.Index('ix_payments_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_payments_property_id_status', 'property_id', 'status'),
+        # One invoice per booking per billing period; see invoices.py
+        db.UniqueConstraint('booking_id', 'period', name='uq_payments_booking_id_period'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(Numeric(10, 2), nullable=False)
@@ -115,6 +138,9 @@ class Payment(db.Model, SerializerMixin):
     property_id = db.Column(db.Integer,
                             db.ForeignKey('properties.id'),
                             nullable=False)
+    # Set on rent invoices generated for a booking; NULL on manual payments
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=True)
+    period = db.Column(db.String(7), nullable=True)  # YYYY-MM
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -123,6 +149,11 @@ class Payment(db.Model, SerializerMixin):
 
 class Issue(db.Model, SerializerMixin):
     __tablename__ = 'issues'
+    __table_args__ = (
+        db.Index('ix_issues_created_at_id', 'created_at', 'id'),
+        db.Index('ix_issues_property_id_status', 'property_id', 'status'),
+        db.Index('ix_issues_reporter_id', 'reporter_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -148,6 +179,9 @@ class Issue(db.Model, SerializerMixin):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 class Notification(db.Model, SerializerMixin):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        db.Index('ix_notifications_user_property_type_created_at', 'user_id', 'property_id', 'notification_type', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -166,6 +200,13 @@ class Notification(db.Model, SerializerMixin):
 
 class Booking(db.Model, SerializerMixin):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        db.Index('ix_bookings_created_at_id', 'created_at', 'id'),
+        db.Index('ix_bookings_tenant_id_created_at_id', 'tenant_id', 'created_at', 'id'),
+        db.Index('ix_bookings_property_id_status_start_date', 'property_id', 'status', 'start_date'),
+        db.Index('ix_bookings_status_end_date', 'status', 'end_date'),
+        db.Index('ix_bookings_status_id', 'status', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     tenant_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -192,8 +233,115 @@ class Booking(db.Model, SerializerMixin):
     )
     
 
+# One row per night a PENDING or CONFIRMED booking holds a property. The
+# (property_id, night) primary key turns a double booking into a constraint
+# violation, so concurrent requests for the same night cannot both commit.
+class BookingNight(db.Model):
+    __tablename__ = 'booking_nights'
+
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), primary_key=True)
+    night = db.Column(db.Date, primary_key=True)
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=False, index=True)
+
+
+# Emails waiting to be sent. Rows are written in the same transaction as the
+# change that triggers them and drained by the background sender in outbox.py;
+# rows that keep failing end up DEAD instead of being retried forever.
+class OutboxEmail(db.Model):
+    __tablename__ = 'outbox'
+    __table_args__ = (
+        db.Index('ix_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.Enum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    sent_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Lease held by the process currently allowed to run a scheduled job, so that
+# a job scheduled in several worker processes only runs in one of them
+class JobLease(db.Model):
+    __tablename__ = 'job_leases'
+
+    name = db.Column(db.String(100), primary_key=True)
+    owner = db.Column(db.String(200), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+
+# Progress of a chunked batch job, committed with each chunk so that a run
+# cut short resumes where it stopped instead of starting over
+class JobCheckpoint(db.Model):
+    __tablename__ = 'job_checkpoints'
+
+    name = db.Column(db.String(100), primary_key=True)
+    period = db.Column(db.String(20), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    completed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Version counter per table, bumped in the same transaction as every ORM write
+# to it (see http_cache.py). Read endpoints derive their ETag from it, so a
+# poll that finds nothing new costs one primary key lookup.
+class ResourceVersion(db.Model):
+    __tablename__ = 'resource_versions'
+
+    name = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Completed payments per property per month, and nights held by confirmed
+# bookings per property per month. Both are kept in step with their source
+# tables by rollups.py in the same transaction, so reports read a handful of
+# rows instead of aggregating payments or bookings on every request.
+class RevenueRollup(db.Model):
+    __tablename__ = 'revenue_rollups'
+    __table_args__ = (
+        db.Index('ix_revenue_rollups_landlord_id_month', 'landlord_id', 'month'),
+    )
+
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    landlord_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    payments = db.Column(db.Integer, nullable=False, default=0)
+    amount = db.Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class OccupancyRollup(db.Model):
+    __tablename__ = 'occupancy_rollups'
+    __table_args__ = (
+        db.Index('ix_occupancy_rollups_landlord_id_month', 'landlord_id', 'month'),
+    )
+
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    landlord_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    booked_nights = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Number of properties per landlord in each status
+class PropertyStatusRollup(db.Model):
+    __tablename__ = 'property_status_rollups'
+
+    landlord_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    status = db.Column(db.Enum(PropertyStatus), primary_key=True)
+    properties = db.Column(db.Integer, nullable=False, default=0)
+
+
 class PropertyImage(db.Model, SerializerMixin):
     __tablename__ = 'property_images'
+    __table_args__ = (
+        db.Index('ix_property_images_property_id', 'property_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
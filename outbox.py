@@ -0,0 +1,117 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_mail import Message
+
+from database import db
+from models import OutboxEmail, OutboxStatus
+
+# Emails claimed per batch
+BATCH_SIZE = 100
+# SMTP connections open at once; each worker sends its share of a batch over one
+SENDER_CONCURRENCY = 4
+# Failed sends are retried with exponential backoff, then dead-lettered
+MAX_ATTEMPTS = 5
+BASE_RETRY_DELAY = timedelta(minutes=1)
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+def outbox_email(recipient, subject, body):
+    """Insert parameters for one outbox row, for bulk inserts."""
+    return {'recipient': recipient, 'subject': subject, 'body': body}
+
+
+def enqueue_email(recipient, subject, body):
+    """Queue an email in the current transaction; the caller commits."""
+    db.session.add(OutboxEmail(**outbox_email(recipient, subject, body)))
+
+
+def retry_delay(attempts):
+    """Backoff before the next try of an email that has failed ``attempts`` times."""
+    return min(BASE_RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def _send_share(app, emails):
+    """Send ``emails`` over one SMTP connection; return {id: error or None}."""
+    results = {}
+    with app.app_context():
+        if app.config.get('TESTING'):
+            for email in emails:
+                logging.info(f"Mock email sent to {email['recipient']}: {email['subject']}")
+                results[email['id']] = None
+            return results
+        try:
+            with app.extensions['mail'].connect() as conn:
+                for email in emails:
+                    try:
+                        msg = Message(email['subject'], recipients=[email['recipient']], body=email['body'])
+                        conn.send(msg)
+                        results[email['id']] = None
+                    except Exception as e:
+                        results[email['id']] = str(e)
+        except Exception as e:
+            # Connecting or closing failed; anything not yet sent is retried
+            for email in emails:
+                results.setdefault(email['id'], str(e))
+    return results
+
+
+def _record_results(results, now):
+    emails = OutboxEmail.query.filter(OutboxEmail.id.in_(list(results))).all()
+    for email in emails:
+        error = results[email.id]
+        email.attempts += 1
+        if error is None:
+            email.status = OutboxStatus.SENT
+            email.sent_at = now
+            email.last_error = None
+        elif email.attempts >= MAX_ATTEMPTS:
+            email.status = OutboxStatus.DEAD
+            email.last_error = error
+            logging.error(f"Email {email.id} to {email.recipient} dead-lettered after {email.attempts} attempts: {error}")
+        else:
+            email.next_attempt_at = now + retry_delay(email.attempts)
+            email.last_error = error
+    db.session.commit()
+
+
+def drain_outbox(batch_size=BATCH_SIZE, concurrency=SENDER_CONCURRENCY, before_batch=None):
+    """Send every due email in the outbox, a batch at a time.
+
+    Must run inside an app context. Only one drainer should run at a time,
+    or an email may be picked up twice, so callers hold the ``send_outbox``
+    lease and pass ``before_batch`` to renew it; draining stops as soon as
+    that returns False. Returns ``(sent, failed)`` counts.
+    """
+    app = current_app._get_current_object()
+    sent = failed = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            if before_batch is not None and not before_batch():
+                logging.warning("Stopped draining the outbox: lease lost")
+                return sent, failed
+            now = datetime.utcnow()
+            batch = [
+                {'id': row.id, 'recipient': row.recipient, 'subject': row.subject, 'body': row.body}
+                for row in db.session.query(OutboxEmail.id, OutboxEmail.recipient, OutboxEmail.subject, OutboxEmail.body)
+                .filter(OutboxEmail.status == OutboxStatus.PENDING, OutboxEmail.next_attempt_at <= now)
+                .order_by(OutboxEmail.next_attempt_at)
+                .limit(batch_size)
+            ]
+            if not batch:
+                return sent, failed
+
+            shares = [batch[i::concurrency] for i in range(concurrency) if batch[i::concurrency]]
+            results = {}
+            for share in pool.map(lambda share: _send_share(app, share), shares):
+                results.update(share)
+            _record_results(results, datetime.utcnow())
+
+            batch_failed = sum(1 for error in results.values() if error is not None)
+            sent += len(results) - batch_failed
+            failed += batch_failed
+            if batch_failed == len(results):
+                # Nothing got through (mail server down?); wait for the next run
+                return sent, failed
@@ -0,0 +1,77 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# KDF used for new hashes, in werkzeug's "method:params" form. Changing it
+# upgrades existing hashes the next time their owner logs in.
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', 16))
+# Processes doing the hashing; 0 hashes inline on the request thread
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+# Hashes queued or running at once before requests are turned away with 503
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', max(PASSWORD_HASH_WORKERS, 1) * 4))
+# Retry-After sent with that 503
+PASSWORD_HASH_RETRY_AFTER = 1
+
+
+class HashingBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHasher:
+    """Runs the password KDF on a bounded process pool.
+
+    Hashing is deliberately slow, so doing it on request threads lets a burst
+    of logins starve every other endpoint. Here the work runs in separate
+    processes, and at most ``queue_limit`` hashes may be pending; beyond that
+    :class:`HashingBusy` is raised instead of queueing without bound.
+    """
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, salt_length=PASSWORD_SALT_LENGTH,
+                 workers=PASSWORD_HASH_WORKERS, queue_limit=PASSWORD_HASH_QUEUE_LIMIT):
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self):
+        # Created on first use so each forked web worker gets its own pool
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            if self.workers == 0:
+                return fn(*args)
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    @cached_property
+    def _stored_method(self):
+        # werkzeug fills in default parameters when it writes a hash
+        # ("scrypt" is stored as "scrypt:32768:8:1"), so ask it once how it
+        # writes the configured method
+        return generate_password_hash('', self.method, 1).split('$', 1)[0]
+
+    def needs_rehash(self, pwhash):
+        """Whether ``pwhash`` was made with different KDF parameters."""
+        return pwhash.split('$', 1)[0] != self._stored_method
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from metrics import PRINCIPAL_CACHE_LOOKUPS
+from models import User
+
+# Entries live this long even if the user is never touched
+PRINCIPAL_TTL_SECONDS = 60
+PRINCIPAL_CACHE_SIZE = 10000
+
+_HITS = PRINCIPAL_CACHE_LOOKUPS.labels('hit')
+_MISSES = PRINCIPAL_CACHE_LOOKUPS.labels('miss')
+
+# Snapshot of the user columns a route may read. Cached instead of the ORM
+# object, which would be detached and expired once its session ends.
+Principal = namedtuple('Principal', ['id', 'email', 'first_name', 'last_name', 'phone', 'user_type'])
+
+
+def principal_from_user(user):
+    return Principal(user.id, user.email, user.first_name, user.last_name, user.phone, user.user_type)
+
+
+class PrincipalCache:
+    """Bounded LRU of authenticated principals keyed by (user id, token).
+
+    Thread safe. Entries expire after ``ttl`` seconds and are dropped as soon
+    as the user row is updated or deleted through the ORM.
+    """
+
+    def __init__(self, maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, token):
+        key = (user_id, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                _HITS.inc()
+                return entry[0]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            _MISSES.inc()
+            return None
+
+    def put(self, user_id, token, principal):
+        key = (user_id, token)
+        with self._lock:
+            self._entries[key] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_changed_users(session, flush_context):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            principal_cache.invalidate_user(obj.id)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _invalidate_on_bulk_user_change(orm_execute_state):
+    # Query.update()/delete() bypass the flush, and we can't tell which rows
+    # they touch, so drop everything
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is User:
+            principal_cache.clear()
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from database import db
+from models import User, Property, Payment, Issue, Booking
+from pagination import page_query
+from reminders import due_reminders_query
+from reservations import filter_available
+from scopes import landlord_rows, user_by_email, user_rows
+from search import filter_properties
+from serializers import (
+    USER_VIEW, PROPERTY_VIEW, BOOKING_VIEW, PAYMENT_VIEW, ISSUE_VIEW, LANDLORD_PROPERTY_VIEW,
+    LANDLORD_BOOKING_VIEW, LANDLORD_ISSUE_VIEW,
+)
+from summaries import summary_queries
+from invoices import invoice_candidates, period_bounds, billing_period
+
+
+def _page(view, query):
+    # First page with every field, as a list route runs it
+    return page_query(view.select(query, view.keys), view.model)
+
+
+def hot_queries():
+    """The queries app.py runs on every request or job, keyed by a label.
+
+    Built from the same helpers the routes call (``filter_properties``,
+    ``scopes``, the list views and ``page_query``), so a change to a route's
+    query is what ``flask check-query-plans`` checks.
+    """
+    now = datetime.utcnow()
+    nairobi = {'city': 'Nairobi'}
+    queries = {
+        'login': user_by_email('tenant1@example.com'),
+        'get_users': _page(USER_VIEW, User.query),
+        'get_properties': _page(PROPERTY_VIEW, filter_properties(Property.query, {})),
+        'get_properties (filtered)': _page(PROPERTY_VIEW, filter_properties(
+            Property.query, {**nairobi, 'status': 'available', 'max_rent': '50000'})),
+        'get_available_properties': _page(PROPERTY_VIEW, filter_available(
+            filter_properties(Property.query, nairobi), now, now + timedelta(days=90))),
+        'get_landlord_properties': _page(LANDLORD_PROPERTY_VIEW, landlord_rows(Property, 1)),
+        'get_bookings (tenant)': _page(BOOKING_VIEW, user_rows(Booking, 'tenant', 1)),
+        'get_bookings (landlord)': _page(BOOKING_VIEW, user_rows(Booking, 'landlord', 1)),
+        'get_landlord_bookings': _page(LANDLORD_BOOKING_VIEW, landlord_rows(Booking, 1)),
+        'get_payments (tenant)': _page(PAYMENT_VIEW, user_rows(Payment, 'tenant', 1)),
+        'get_payments (landlord)': _page(PAYMENT_VIEW, user_rows(Payment, 'landlord', 1)),
+        'get_issues': _page(ISSUE_VIEW, Issue.query),
+        'get_landlord_issues': _page(LANDLORD_ISSUE_VIEW, landlord_rows(Issue, 1)),
+        'send_rent_reminders': due_reminders_query(now),
+        'generate_invoices': invoice_candidates(*period_bounds(billing_period(now)), 0, 1000),
+    }
+    for section, query in summary_queries(1, now).items():
+        queries[f'get_landlord_summary ({section})'] = query
+    return queries
+
+
+def explain(query):
+    """Return the ``EXPLAIN QUERY PLAN`` detail lines for an ORM query."""
+    sql = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')).all()
+    return [row[3] for row in rows]
+
+
+def is_full_scan(step, filtered):
+    """Whether a plan step reads a whole table instead of seeking into it.
+
+    An unfiltered keyset page shows up as "SCAN users USING INDEX ..." and is
+    fine: it walks the index in order and stops at the LIMIT. Any other SCAN
+    means a filter is being applied row by row.
+    """
+    if not step.startswith('SCAN '):
+        return False
+    return filtered or 'USING' not in step
+
+
+def full_scans():
+    """Map each hot query that contains a full table scan to its plan."""
+    regressions = {}
+    for label, query in hot_queries().items():
+        plan = explain(query)
+        filtered = query.whereclause is not None
+        if any(is_full_scan(step, filtered) for step in plan):
+            regressions[label] = plan
+    return regressions
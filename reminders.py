@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from database import db
+from models import User, Property, Notification, Booking, BookingStatus, NotificationType
+
+# Remind tenants whose booking ends within this many days
+REMINDER_WINDOW_DAYS = 3
+# Don't remind the same tenant about the same property more often than this
+REMINDER_COOLDOWN = timedelta(days=1)
+# Notifications written per transaction, so the write lock is released between chunks
+INSERT_CHUNK_SIZE = 1000
+
+
+def due_reminders_query(now):
+    """CONFIRMED bookings ending within the reminder window with no recent reminder.
+
+    One statement: bookings are found through the (status, end_date) index,
+    joined to their tenant and property for the email text, and anti-joined
+    against RENT_REMINDER notifications created inside the cooldown.
+    """
+    today = datetime(now.year, now.month, now.day)
+    recent_reminder = db.session.query(Notification.id).filter(
+        Notification.user_id == Booking.tenant_id,
+        Notification.property_id == Booking.property_id,
+        Notification.notification_type == NotificationType.RENT_REMINDER,
+        Notification.created_at >= now - REMINDER_COOLDOWN,
+    )
+    return (
+        db.session.query(
+            User.id.label('tenant_id'),
+            User.email,
+            Property.id.label('property_id'),
+            Property.title,
+            Property.rent_amount,
+            Booking.end_date,
+        )
+        .select_from(Booking)
+        .join(User, User.id == Booking.tenant_id)
+        .join(Property, Property.id == Booking.property_id)
+        .filter(
+            Booking.status == BookingStatus.CONFIRMED,
+            Booking.end_date >= today,
+            Booking.end_date < today + timedelta(days=REMINDER_WINDOW_DAYS + 1),
+            ~recent_reminder.exists(),
+        )
+        .order_by(Booking.end_date)
+    )
+
+
+def reminder_notification(row):
+    """Build the notification insert parameters for one due reminder row."""
+    rent_due_date = row.end_date.date()
+    return {
+        'title': f'Rent Due Reminder - {row.title}',
+        'message': f'Your rent payment of KES {row.rent_amount} for {row.title} is due on {rent_due_date.strftime("%B %d, %Y")}. Please make payment to avoid late fees.',
+        'notification_type': NotificationType.RENT_REMINDER,
+        'user_id': row.tenant_id,
+        'property_id': row.property_id,
+    }
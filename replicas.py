@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import REPLICA_BIND, db, engine_options
+
+# Methods whose requests may read from the replica
+READ_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+# Holds the time until which this client's reads go to the primary
+STICKY_COOKIE = 'read_primary_until'
+
+
+def replica_binds(environ=os.environ):
+    """``SQLALCHEMY_BINDS`` with the replica from ``DATABASE_REPLICA_URL``, if set."""
+    url = environ.get('DATABASE_REPLICA_URL')
+    if not url:
+        return {}
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return {REPLICA_BIND: dict(engine_options(url, environ), url=url)}
+
+
+def sticky_seconds(environ=os.environ):
+    """How long after a write a client keeps reading from the primary."""
+    return float(environ.get('REPLICA_STICKY_SECONDS', '5'))
+
+
+def _primary_until():
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return 0
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_write(session, flush_context):
+    if has_request_context():
+        g.wrote_primary = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _note_bulk_write(orm_execute_state):
+    # session.execute(insert(Model), rows) and Query.update()/delete() skip the flush
+    if has_request_context() and (orm_execute_state.is_insert or orm_execute_state.is_update
+                                  or orm_execute_state.is_delete):
+        g.wrote_primary = True
+
+
+def init_replica_routing(app):
+    """Route safe requests to the replica, keeping recent writers on the primary.
+
+    GET, HEAD and OPTIONS requests read from the replica unless the client
+    wrote something in the last ``REPLICA_STICKY_SECONDS``. A request that
+    flushes a write sets a cookie that pins the client's reads to the
+    primary for that window, so it never reads data older than its own
+    write while the replica catches up. Without a configured replica this
+    does nothing.
+    """
+    if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+    window = sticky_seconds()
+
+    @app.before_request
+    def choose_database():
+        g.use_replica = request.method in READ_METHODS and _primary_until() < time.time()
+
+    @app.after_request
+    def pin_recent_writer(response):
+        if g.get('wrote_primary') and window > 0:
+            response.set_cookie(STICKY_COOKIE, f'{time.time() + window:.3f}', max_age=int(window) + 1,
+                                httponly=True, samesite='Lax')
+        return response
+
+
+def sync_sqlite_replica():
+    """Copy the primary SQLite database over the replica file.
+
+    Stands in for replication when both are SQLite files, e.g. run after
+    writes in local testing. Uses the backup API, so it is consistent even
+    while the primary is being written. Returns the replica path.
+    """
+    if REPLICA_BIND not in db.engines:
+        raise ValueError('No replica configured; set DATABASE_REPLICA_URL')
+    primary, replica = db.engine.url, db.engines[REPLICA_BIND].url
+    if primary.get_backend_name() != 'sqlite' or replica.get_backend_name() != 'sqlite':
+        raise ValueError('Only SQLite primaries and replicas can be synced this way')
+    source = sqlite3.connect(primary.database)
+    target = sqlite3.connect(replica.database)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return replica.database
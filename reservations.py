@@ -0,0 +1,82 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import Session
+
+from database import db
+from models import Booking, BookingNight, BookingStatus, Property, PropertyStatus
+
+# Bookings in these states hold their nights
+HOLDING_STATUSES = (BookingStatus.PENDING, BookingStatus.CONFIRMED)
+# Longest stay one booking may cover: every night is a booking_nights row
+MAX_STAY_NIGHTS = int(os.getenv('MAX_STAY_NIGHTS', 366))
+
+
+def parse_stay_date(value):
+    """Parse an ISO date or datetime from a request as naive UTC.
+
+    Values with an offset (including a trailing ``Z``) are converted to UTC;
+    naive values are taken as UTC already, so the two can be compared.
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def nights_between(start_date, end_date):
+    """Nights covered by a stay; the check-out day itself is not a night.
+
+    A stay that starts and ends on the same day still holds that one night.
+    """
+    first = start_date.date()
+    nights = max((end_date.date() - first).days, 1)
+    return [first + timedelta(days=i) for i in range(nights)]
+
+
+def reserve_nights(booking):
+    """Claim every night of ``booking`` for its property.
+
+    The rows are written immediately, so an ``IntegrityError`` from this call
+    means another PENDING or CONFIRMED booking already holds one of the nights.
+    The caller owns the transaction and should roll back in that case.
+    """
+    db.session.execute(insert(BookingNight), [
+        {'property_id': booking.property_id, 'night': night, 'booking_id': booking.id}
+        for night in nights_between(booking.start_date, booking.end_date)
+    ])
+
+
+def release_nights(booking):
+    """Free the nights held by ``booking``, e.g. when it is cancelled."""
+    BookingNight.query.filter_by(booking_id=booking.id).delete(synchronize_session=False)
+
+
+@event.listens_for(Session, 'before_flush')
+def _release_finished_bookings(session, flush_context, instances):
+    # Runs before the flush so a deleted booking's nights go before the
+    # booking row their foreign key points at
+    for obj in session.dirty:
+        if isinstance(obj, Booking) and obj.status not in HOLDING_STATUSES \
+                and inspect(obj).attrs.status.history.has_changes():
+            release_nights(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Booking):
+            release_nights(obj)
+
+
+def filter_available(query, start_date, end_date):
+    """Keep only properties with no night held between the two dates.
+
+    A single anti-join against ``booking_nights``: for each candidate the
+    database probes the (property_id, night) primary key over the window,
+    so the cost does not depend on how many bookings a property has.
+    """
+    nights = nights_between(start_date, end_date)
+    held = db.session.query(BookingNight.property_id).filter(
+        BookingNight.property_id == Property.id,
+        BookingNight.night >= nights[0],
+        BookingNight.night <= nights[-1],
+    )
+    return query.filter(Property.status == PropertyStatus.AVAILABLE, ~held.exists())
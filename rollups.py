@@ -0,0 +1,245 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import delete, event, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from database import db, dialect_insert
+from models import (
+    Booking, BookingStatus, OccupancyRollup, Payment, PaymentStatus, Property, PropertyStatusRollup,
+    RevenueRollup,
+)
+from reservations import nights_between
+
+CENTS = Decimal('0.01')
+REBUILD_BATCH_SIZE = 1000
+
+
+def _month(value):
+    return value.strftime('%Y-%m')
+
+
+def payment_revenue(values):
+    """Revenue rollup entries for a payment: completed payments count in the
+    month they were paid (or due, if no payment date was recorded)."""
+    when = values['payment_date'] or values['due_date']
+    if values['status'] != PaymentStatus.COMPLETED or when is None or values['property_id'] is None:
+        return []
+    return [((values['property_id'], _month(when)), {'payments': 1, 'amount': Decimal(values['amount'])})]
+
+
+def booking_occupancy(values):
+    """Occupancy rollup entries for a booking: each confirmed night counts in its own month."""
+    if values['status'] != BookingStatus.CONFIRMED or values['start_date'] is None or values['end_date'] is None:
+        return []
+    nights = defaultdict(int)
+    for night in nights_between(values['start_date'], values['end_date']):
+        nights[_month(night)] += 1
+    return [((values['property_id'], month), {'booked_nights': count}) for month, count in nights.items()]
+
+
+def property_status(values):
+    """Status rollup entry for a property."""
+    if values['status'] is None or values['landlord_id'] is None:
+        return []
+    return [((values['landlord_id'], values['status']), {'properties': 1})]
+
+
+# Source model -> (rollup, contribution function, columns it reads)
+ROLLUPS = {
+    Payment: (RevenueRollup, payment_revenue, ('status', 'payment_date', 'due_date', 'property_id', 'amount')),
+    Booking: (OccupancyRollup, booking_occupancy, ('status', 'start_date', 'end_date', 'property_id')),
+    Property: (PropertyStatusRollup, property_status, ('status', 'landlord_id')),
+}
+
+
+def _load_previous_values():
+    # active_history makes the ORM load the old value before an expired column
+    # is overwritten, so the flush listener can always subtract what was there
+    def keep_value(target, value, oldvalue, initiator):
+        return value
+
+    for model, (_, _, columns) in ROLLUPS.items():
+        for column in columns:
+            event.listen(getattr(model, column), 'set', keep_value, active_history=True)
+
+
+_load_previous_values()
+
+
+def _current(obj, columns):
+    return {column: getattr(obj, column) for column in columns}
+
+
+def _previous(obj, columns):
+    state = inspect(obj)
+    values = {}
+    for column in columns:
+        history = state.attrs[column].history
+        if history.deleted:
+            values[column] = history.deleted[0]
+        elif history.unchanged:
+            values[column] = history.unchanged[0]
+        else:
+            values[column] = None
+    return values
+
+
+def _measures(rollup):
+    keys = {column.name for column in rollup.__table__.primary_key.columns} | {'landlord_id'}
+    return [column.name for column in rollup.__table__.columns if column.name not in keys]
+
+
+def _upsert(connection, rollup, key, landlord_id, measures):
+    table = rollup.__table__
+    primary_key = [column.name for column in table.primary_key.columns]
+    values = dict(zip(primary_key, key), **measures)
+    if 'landlord_id' not in primary_key:
+        values['landlord_id'] = landlord_id
+    stmt = dialect_insert(connection)(table).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=primary_key,
+        set_={name: table.c[name] + stmt.excluded[name] for name in measures},
+    )
+    connection.execute(stmt)
+
+
+def _new_deltas():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def _add(deltas, model, values, sign):
+    rollup, contribution, _ = ROLLUPS[model]
+    for key, measures in contribution(values):
+        for name, value in measures.items():
+            deltas[(rollup, key)][name] += sign * value
+
+
+def _apply(connection, deltas):
+    property_ids = {key[0] for (rollup, key) in deltas if rollup is not PropertyStatusRollup}
+    landlords = dict(connection.execute(
+        select(Property.id, Property.landlord_id).where(Property.id.in_(property_ids))).all()) if property_ids else {}
+    for (rollup, key), measures in deltas.items():
+        if not any(measures.values()):
+            continue
+        landlord_id = None if rollup is PropertyStatusRollup else landlords.get(key[0])
+        if rollup is not PropertyStatusRollup and landlord_id is None:
+            continue
+        _upsert(connection, rollup, key, landlord_id, measures)
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_rollup_deltas(session, flush_context):
+    deltas = _new_deltas()
+    moved_properties = {}
+
+    for obj in session.new:
+        if type(obj) in ROLLUPS:
+            _add(deltas, type(obj), _current(obj, ROLLUPS[type(obj)][2]), 1)
+    for obj in session.dirty:
+        if type(obj) in ROLLUPS:
+            columns = ROLLUPS[type(obj)][2]
+            before, after = _previous(obj, columns), _current(obj, columns)
+            if before != after:
+                _add(deltas, type(obj), before, -1)
+                _add(deltas, type(obj), after, 1)
+            if isinstance(obj, Property) and before['landlord_id'] != after['landlord_id']:
+                moved_properties[obj.id] = after['landlord_id']
+    for obj in session.deleted:
+        if type(obj) in ROLLUPS:
+            _add(deltas, type(obj), _previous(obj, ROLLUPS[type(obj)][2]), -1)
+
+    if not deltas and not moved_properties:
+        return
+    connection = session.connection()
+    for property_id, landlord_id in moved_properties.items():
+        for rollup in (RevenueRollup, OccupancyRollup):
+            connection.execute(update(rollup.__table__)
+                               .where(rollup.__table__.c.property_id == property_id)
+                               .values(landlord_id=landlord_id))
+    _apply(connection, deltas)
+
+
+def record_bulk_insert(session, model, rows):
+    """Update the rollups for ``rows`` written with a bulk ``insert(model)``.
+
+    Bulk inserts skip the flush, so callers that use them on a tracked model
+    call this in the same transaction. Each row must carry the columns
+    listed for ``model`` in ``ROLLUPS``.
+    """
+    deltas = _new_deltas()
+    for values in rows:
+        _add(deltas, model, values, 1)
+    _apply(session.connection(), deltas)
+
+
+def _normalize(row):
+    return {name: value.quantize(CENTS) if isinstance(value, Decimal) else value for name, value in row.items()}
+
+
+def expected_rollups():
+    """Recompute every rollup row from the source tables.
+
+    Returns ``{rollup: {primary key: {column: value}}}``, built with the same
+    contribution functions the flush listener uses.
+    """
+    expected = {}
+    for model, (rollup, contribution, columns) in ROLLUPS.items():
+        rows = defaultdict(lambda: defaultdict(int))
+        query = select(*(getattr(model, column) for column in columns))
+        if model is not Property:
+            query = query.add_columns(Property.landlord_id.label('rollup_landlord_id')).join(Property)
+        for row in db.session.execute(query.execution_options(yield_per=REBUILD_BATCH_SIZE)):
+            values = row._asdict()
+            for key, measures in contribution(values):
+                if model is not Property:
+                    rows[key]['landlord_id'] = values['rollup_landlord_id']
+                for name, value in measures.items():
+                    rows[key][name] += value
+        expected[rollup] = {key: _normalize(dict(row)) for key, row in rows.items()}
+    return expected
+
+
+def actual_rollups():
+    """Current contents of the rollup tables, ignoring rows that have gone to zero."""
+    actual = {}
+    for rollup, _, _ in ROLLUPS.values():
+        table = rollup.__table__
+        primary_key = [column.name for column in table.primary_key.columns]
+        measures = _measures(rollup)
+        rows = {}
+        for row in db.session.execute(select(table)).mappings():
+            if any(row[name] for name in measures):
+                rows[tuple(row[name] for name in primary_key)] = _normalize(
+                    {name: row[name] for name in table.columns.keys() if name not in primary_key})
+        actual[rollup] = rows
+    return actual
+
+
+def diff_rollups(expected=None):
+    """List ``(table, key, expected, actual)`` for every rollup row that is wrong."""
+    expected = expected_rollups() if expected is None else expected
+    actual = actual_rollups()
+    differences = []
+    for rollup, rows in expected.items():
+        found = actual[rollup]
+        for key in sorted(set(rows) | set(found), key=str):
+            if rows.get(key) != found.get(key):
+                differences.append((rollup.__tablename__, key, rows.get(key), found.get(key)))
+    return differences
+
+
+def rebuild_rollups():
+    """Replace the rollup tables with a fresh recomputation.
+
+    Returns the differences that were corrected. The caller commits.
+    """
+    expected = expected_rollups()
+    differences = diff_rollups(expected)
+    for rollup, rows in expected.items():
+        table = rollup.__table__
+        primary_key = [column.name for column in table.primary_key.columns]
+        db.session.execute(delete(table))
+        if rows:
+            db.session.execute(insert(table), [dict(zip(primary_key, key), **row) for key, row in rows.items()])
+    return differences
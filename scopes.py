@@ -0,0 +1,25 @@
+from database import db
+from models import Booking, Payment, Property, User
+
+# The column that ties each row to its tenant on /api/bookings and /api/payments
+TENANT_COLUMNS = {Booking: 'tenant_id', Payment: 'user_id'}
+
+
+def user_by_email(email):
+    return User.query.filter_by(email=email)
+
+
+def landlord_rows(model, landlord_id):
+    """The landlord's properties, or the rows of ``model`` on those properties."""
+    if model is Property:
+        return Property.query.filter_by(landlord_id=landlord_id)
+    return db.session.query(model).join(Property).filter(Property.landlord_id == landlord_id)
+
+
+def user_rows(model, user_type, user_id):
+    """Bookings or payments for a tenant or a landlord; all of them for anyone else."""
+    if user_type == 'tenant':
+        return model.query.filter_by(**{TENANT_COLUMNS[model]: user_id})
+    if user_type == 'landlord':
+        return landlord_rows(model, user_id)
+    return model.query
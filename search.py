@@ -0,0 +1,141 @@
+import re
+from contextlib import contextmanager
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import and_, or_, select
+
+from database import db
+from models import Property, PropertyStatus
+
+
+def _number_arg(args, name, cast):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return cast(value)
+    except (ValueError, InvalidOperation):
+        raise ValueError(f'{name} must be a number')
+
+
+def filter_properties(query, args):
+    """Narrow a ``Property`` query by the search parameters in ``args``.
+
+    Every filter becomes a SQL predicate so the catalogue is searched by the
+    database (backed by the composite indexes on ``properties``) rather than
+    shipped to the client in full. Raises ``ValueError`` for malformed values.
+    """
+    if args.get('city'):
+        query = query.filter(Property.city == args['city'])
+    if args.get('type'):
+        query = query.filter(Property.type == args['type'])
+    if args.get('status'):
+        try:
+            status = PropertyStatus(args['status'].lower())
+        except ValueError:
+            raise ValueError(f"status must be one of {', '.join(s.value for s in PropertyStatus)}")
+        query = query.filter(Property.status == status)
+
+    min_rent = _number_arg(args, 'min_rent', Decimal)
+    if min_rent is not None:
+        query = query.filter(Property.rent_amount >= min_rent)
+    max_rent = _number_arg(args, 'max_rent', Decimal)
+    if max_rent is not None:
+        query = query.filter(Property.rent_amount <= max_rent)
+
+    for name, column in (('min_bedrooms', Property.bedrooms),
+                         ('min_bathrooms', Property.bathrooms),
+                         ('min_area_sqft', Property.area_sqft)):
+        value = _number_arg(args, name, int)
+        if value is not None:
+            query = query.filter(column >= value)
+    return query
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Each word is quoted so user input can never be parsed as FTS5 syntax
+    (``AND``, ``NEAR``, ``*``, unbalanced quotes); the terms are implicitly
+    ANDed together.
+    """
+    return ' '.join(f'"{term}"' for term in re.findall(r'\w+', text))
+
+
+def _search_terms(text, limit):
+    # Without FTS5 (the index only exists on SQLite) every word must appear
+    # in one of the indexed columns; results come back newest first
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return []
+    columns = (Property.title, Property.description, Property.address, Property.city)
+    matches = [or_(*(column.icontains(term, autoescape=True) for column in columns)) for term in terms]
+    return Property.query.filter(and_(*matches)) \
+        .order_by(Property.created_at.desc(), Property.id.desc()).limit(limit).all()
+
+
+def search_properties(text, limit):
+    """Return up to ``limit`` properties matching ``text``, best match first."""
+    if db.session.connection().dialect.name != 'sqlite':
+        return _search_terms(text, limit)
+    match = fts_query(text)
+    if not match:
+        return []
+    stmt = db.text(
+        'SELECT properties.* FROM properties_fts '
+        'JOIN properties ON properties.id = properties_fts.rowid '
+        'WHERE properties_fts MATCH :match '
+        'ORDER BY properties_fts.rank LIMIT :limit'
+    )
+    return db.session.execute(
+        select(Property).from_statement(stmt),
+        {'match': match, 'limit': limit},
+    ).scalars().all()
+
+
+def rebuild_property_index():
+    """Re-index every property, e.g. after rows were written with triggers off."""
+    if db.session.connection().dialect.name != 'sqlite':
+        return
+    db.session.execute(db.text("INSERT INTO properties_fts(properties_fts) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+@contextmanager
+def deferred_property_index():
+    """Index properties inserted inside the block in one pass at the end.
+
+    The per-row ``properties_fts_ai`` trigger makes bulk inserts several
+    times slower. Inside this block it is dropped; the block yields a list
+    to which the caller adds the id of every property it inserts, and on
+    exit exactly those rows are indexed before the trigger is put back.
+    SQLite DDL is transactional and the block holds the write lock from the
+    start, so other connections never see the trigger missing, and a
+    rollback restores it. The caller commits or rolls back afterwards. On
+    other databases, or without the search index, this does nothing.
+
+    Dropping the trigger changes the schema, which makes every other
+    connection re-prepare its statements, so this is for offline bulk loads
+    (CLI imports, generated data), not for request handlers.
+    """
+    connection = db.session.connection()
+    trigger = None
+    if connection.dialect.name == 'sqlite':
+        if not connection.connection.driver_connection.in_transaction:
+            # The driver doesn't open a transaction for DDL on its own
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+        trigger = connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'properties_fts_ai'").scalar()
+    new_ids = []
+    if trigger is None:
+        yield new_ids
+        return
+
+    connection.exec_driver_sql('DROP TRIGGER properties_fts_ai')
+    yield new_ids
+    if new_ids:
+        connection.exec_driver_sql(
+            'INSERT INTO properties_fts(rowid, title, description, address, city) '
+            'SELECT id, title, description, address, city FROM properties WHERE id = ?',
+            [(property_id,) for property_id in new_ids])
+    connection.exec_driver_sql(trigger)
@@ -1,13 +1,16 @@
 from database import db
 from app import app  # make sure this imports your Flask app
-from models import User, Property, Payment, Issue, Notification, Booking, PropertyImage, UserType, PropertyStatus, PaymentStatus, IssueStatus, IssueType, NotificationType, BookingStatus
+from models import User, Property, Payment, Issue, Notification, Booking, BookingNight, PropertyImage, UserType, PropertyStatus, PaymentStatus, IssueStatus, IssueType, NotificationType, BookingStatus
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta
+from reservations import reserve_nights
+from rollups import rebuild_rollups
 
 def seed_data():
     with app.app_context():
         print("🌱 Seeding users and properties...")
         
+        db.session.query(BookingNight).delete()
         db.session.query(Property).delete()
         db.session.query(User).delete()
         db.session.commit()
@@ -237,6 +240,9 @@ def seed_data():
         )
 
         db.session.add_all([booking1, booking2, booking3])
+        db.session.flush()
+        reserve_nights(booking1)
+        reserve_nights(booking2)
         db.session.commit()
 
         print("✅ Bookings seeded successfully!")
@@ -273,6 +279,10 @@ def seed_data():
         db.session.commit()
 
         print("✅ Property Images seeded successfully!")
+
+        # The deletes above bypass the ORM, so recompute the rollups from scratch
+        rebuild_rollups()
+        db.session.commit()
         print("🎉 Seeding completed without dropping any tables.")
 
 if __name__ == "__main__":
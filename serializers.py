@@ -0,0 +1,126 @@
+from functools import lru_cache
+
+from sqlalchemy import Date, DateTime, Enum, Numeric
+
+from models import User, Property, Booking, Payment, Issue
+
+# Same output formats as SerializerMixin.to_dict, so responses don't change
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def _converter(column_type):
+    if isinstance(column_type, Enum):
+        return lambda value: value.value
+    if isinstance(column_type, Numeric):
+        return str
+    if isinstance(column_type, DateTime):
+        return lambda value: value.strftime(DATETIME_FORMAT)
+    if isinstance(column_type, Date):
+        return lambda value: value.strftime(DATE_FORMAT)
+    return None
+
+
+def isoformat(value):
+    return value.isoformat()
+
+
+def _field_spec(model, field):
+    # A field is a column name, or a (key, column name, converter) triple for
+    # output that is renamed or formatted differently from to_dict
+    key, attribute, convert = (field, field, None) if isinstance(field, str) else field
+    if convert is None:
+        convert = _converter(model.__table__.columns[attribute].type)
+    return key, attribute, convert
+
+
+def compile_serializer(model, fields):
+    """Build a function that turns a ``model`` row into a dict of ``fields``.
+
+    The rules ``to_dict(only=...)`` works out on every call (which columns,
+    how to format each type) are resolved once here. They go into the source
+    of a small function compiled with ``exec``, so serializing a row is one
+    attribute read and at most one conversion per field. The function works
+    on ORM instances and on column-projected result rows alike.
+    """
+    namespace = {}
+    items = []
+    for i, field in enumerate(fields):
+        key, attribute, convert = _field_spec(model, field)
+        if convert is None:
+            items.append(f'{key!r}: row.{attribute}')
+        else:
+            namespace[f'convert_{i}'] = convert
+            items.append(f'{key!r}: None if row.{attribute} is None else convert_{i}(row.{attribute})')
+    source = 'def serialize(row):\n    return {' + ', '.join(items) + '}\n'
+    exec(compile(source, f'<serializer {model.__name__}>', 'exec'), namespace)
+    return namespace['serialize']
+
+
+class InvalidFieldset(ValueError):
+    """Raised when ``fields`` names something the endpoint does not return."""
+
+
+class ListView:
+    """The fields a list endpoint returns, and the columns behind them.
+
+    ``select`` narrows a query to the columns the requested fields need, plus
+    ``id`` and ``created_at`` for pagination, so rows come back as plain
+    tuples instead of ORM objects and unused columns are never read.
+    ``serializer`` returns the compiled serializer for the same fields.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = tuple(_field_spec(model, field) for field in fields)
+        self.keys = tuple(key for key, _, _ in self.fields)
+        self.serializer = lru_cache(maxsize=64)(self._compile)
+
+    def fieldset(self, args):
+        """Read the ``fields`` query parameter; all fields if it is absent."""
+        requested = {name.strip() for name in args.get('fields', '').split(',') if name.strip()}
+        if not requested:
+            return self.keys
+        unknown = requested - set(self.keys)
+        if unknown:
+            raise InvalidFieldset(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return tuple(key for key in self.keys if key in requested)
+
+    def select(self, query, keys):
+        attributes = ['id', 'created_at']
+        for key, attribute, _ in self.fields:
+            if key in keys and attribute not in attributes:
+                attributes.append(attribute)
+        return query.with_entities(*(getattr(self.model, attribute) for attribute in attributes))
+
+    def _compile(self, keys):
+        return compile_serializer(self.model, [field for field in self.fields if field[0] in keys])
+
+
+PROPERTY_FIELDS = ('title', 'description', 'id', 'rent_amount', 'address', 'city',
+                   'bedrooms', 'bathrooms', 'url', 'type', 'area_sqft', 'status')
+USER_FIELDS = ('id', 'first_name', 'last_name', 'email', 'phone', 'user_type')
+
+serialize_property = compile_serializer(Property, PROPERTY_FIELDS)
+serialize_user = compile_serializer(User, USER_FIELDS)
+
+USER_VIEW = ListView(User, USER_FIELDS)
+PROPERTY_VIEW = ListView(Property, PROPERTY_FIELDS)
+BOOKING_VIEW = ListView(Booking, (
+    'id', 'tenant_id', 'property_id', ('start_date', 'start_date', isoformat),
+    ('end_date', 'end_date', isoformat), 'status', 'special_requests',
+    ('created_at', 'created_at', isoformat)))
+PAYMENT_VIEW = ListView(Payment, (
+    'id', 'amount', 'status', ('due_date', 'due_date', isoformat),
+    ('payment_date', 'payment_date', isoformat), 'user_id', 'property_id',
+    'payment_method', 'notes'))
+ISSUE_VIEW = ListView(Issue, (
+    'id', 'description', 'status', ('user_id', 'reporter_id', None), 'property_id'))
+LANDLORD_PROPERTY_VIEW = ListView(Property, (
+    'id', 'title', ('rent_amount', 'rent_amount', float), 'status', 'city', 'bedrooms', 'bathrooms'))
+LANDLORD_BOOKING_VIEW = ListView(Booking, (
+    'id', 'property_id', 'tenant_id', ('start_date', 'start_date', isoformat),
+    ('end_date', 'end_date', isoformat), 'status'))
+LANDLORD_ISSUE_VIEW = ListView(Issue, (
+    'id', 'title', 'description', 'status', 'priority', 'property_id',
+    ('created_at', 'created_at', isoformat)))
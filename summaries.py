@@ -0,0 +1,97 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import func
+
+from database import db
+from models import (
+    Property, Payment, Issue, Booking, PropertyStatus, PaymentStatus, IssueStatus, BookingStatus,
+    OccupancyRollup, PropertyStatusRollup, RevenueRollup,
+)
+
+ACTIVE_ISSUE_STATUSES = (IssueStatus.OPEN, IssueStatus.IN_PROGRESS)
+SUMMARY_PAYMENT_STATUSES = (PaymentStatus.PENDING, PaymentStatus.COMPLETED)
+UPCOMING_BOOKING_STATUSES = (BookingStatus.PENDING, BookingStatus.CONFIRMED)
+
+
+def summary_queries(landlord_id, now):
+    """The queries behind a landlord summary, keyed by section.
+
+    Property counts come straight from the status rollup; the rest aggregate
+    in the database. Each returns at most one row per status, so the work
+    done here doesn't depend on portfolio size.
+    """
+    owned = Property.landlord_id == landlord_id
+    return {
+        'properties': db.session.query(PropertyStatusRollup.status, PropertyStatusRollup.properties)
+            .filter(PropertyStatusRollup.landlord_id == landlord_id),
+        'issues': db.session.query(Issue.status, func.count(Issue.id))
+            .join(Property)
+            .filter(owned, Issue.status.in_(ACTIVE_ISSUE_STATUSES))
+            .group_by(Issue.status),
+        'payments': db.session.query(Payment.status, func.count(Payment.id), func.sum(Payment.amount))
+            .join(Property)
+            .filter(owned, Payment.status.in_(SUMMARY_PAYMENT_STATUSES))
+            .group_by(Payment.status),
+        'bookings': db.session.query(Booking.status, func.count(Booking.id))
+            .join(Property)
+            .filter(owned, Booking.status.in_(UPCOMING_BOOKING_STATUSES), Booking.start_date >= now)
+            .group_by(Booking.status),
+    }
+
+
+def landlord_summary(landlord_id, now=None):
+    """Occupancy, active issues, payment totals and upcoming bookings for a landlord."""
+    queries = summary_queries(landlord_id, now or datetime.utcnow())
+
+    properties = {status.value: 0 for status in PropertyStatus}
+    for status, count in queries['properties']:
+        properties[status.value] = count
+
+    issues = {status.value: 0 for status in ACTIVE_ISSUE_STATUSES}
+    for status, count in queries['issues']:
+        issues[status.value] = count
+
+    payments = {status.value: {'count': 0, 'total': '0.00'} for status in SUMMARY_PAYMENT_STATUSES}
+    for status, count, total in queries['payments']:
+        payments[status.value] = {'count': count, 'total': str(Decimal(total or 0).quantize(Decimal('0.01')))}
+
+    bookings = {status.value: 0 for status in UPCOMING_BOOKING_STATUSES}
+    for status, count in queries['bookings']:
+        bookings[status.value] = count
+
+    return {
+        'properties': {'total': sum(properties.values()), 'by_status': properties},
+        'issues': {'active': sum(issues.values()), 'by_status': issues},
+        'payments': payments,
+        'bookings': {'upcoming': sum(bookings.values()), 'by_status': bookings},
+    }
+
+
+def landlord_revenue(landlord_id, first_month=None, last_month=None):
+    """Completed payments and confirmed nights per month, read from the rollups.
+
+    ``first_month`` and ``last_month`` are inclusive ``YYYY-MM`` bounds.
+    """
+    months = {}
+    revenue = db.session.query(RevenueRollup.month, func.sum(RevenueRollup.payments), func.sum(RevenueRollup.amount)) \
+        .filter(RevenueRollup.landlord_id == landlord_id)
+    occupancy = db.session.query(OccupancyRollup.month, func.sum(OccupancyRollup.booked_nights)) \
+        .filter(OccupancyRollup.landlord_id == landlord_id)
+    if first_month:
+        revenue = revenue.filter(RevenueRollup.month >= first_month)
+        occupancy = occupancy.filter(OccupancyRollup.month >= first_month)
+    if last_month:
+        revenue = revenue.filter(RevenueRollup.month <= last_month)
+        occupancy = occupancy.filter(OccupancyRollup.month <= last_month)
+
+    def month_row(month):
+        return months.setdefault(month, {'month': month, 'payments': 0, 'amount': '0.00', 'booked_nights': 0})
+
+    for month, payments, amount in revenue.group_by(RevenueRollup.month):
+        row = month_row(month)
+        row['payments'] = payments
+        row['amount'] = str(Decimal(amount or 0).quantize(Decimal('0.01')))
+    for month, nights in occupancy.group_by(OccupancyRollup.month):
+        month_row(month)['booked_nights'] = nights
+    return [months[month] for month in sorted(months)]
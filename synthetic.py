@@ -0,0 +1,292 @@
+import bisect
+import itertools
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+
+from database import db
+from models import (
+    Booking, BookingNight, BookingStatus, Issue, IssueStatus, IssueType, Notification, NotificationType,
+    Payment, PaymentStatus, Property, PropertyImage, PropertyStatus, User, UserType,
+)
+from reservations import nights_between
+from rollups import rebuild_rollups
+from search import deferred_property_index
+
+# Rows buffered per table before a batch is written
+GENERATE_BATCH_SIZE = 1000
+# Everyone's password is "password123"; hashing it per user would dominate the run
+SYNTHETIC_PASSWORD = 'password123'
+
+FIRST_NAMES = [
+    'Wanjiku', 'Achieng', 'Kamau', 'Otieno', 'Njeri', 'Kiprop', 'Chebet', 'Mutua', 'Wairimu', 'Omondi',
+    'Akinyi', 'Kiptoo', 'Nyambura', 'Wafula', 'Nekesa', 'Barasa', 'Moraa', 'Onyango', 'Jepkosgei', 'Brian',
+    'Mary', 'James', 'Alice', 'Faith', 'Kevin', 'Mercy', 'Dennis', 'Grace', 'Collins', 'Esther',
+]
+LAST_NAMES = [
+    'Mwangi', 'Otieno', 'Kamau', 'Odhiambo', 'Kariuki', 'Njoroge', 'Kiprotich', 'Wanyama', 'Mutiso', 'Ochieng',
+    'Kipchumba', 'Muthoni', 'Wekesa', 'Nyaga', 'Macharia', 'Owino', 'Koech', 'Cheruiyot', 'Gitau', 'Maina',
+]
+# City -> (share of listings, rent multiplier, neighbourhoods)
+CITIES = {
+    'Nairobi': (40, 1.0, ['Kilimani', 'Westlands', 'Kileleshwa', 'South B', 'Roysambu', 'Kasarani',
+                          'Embakasi', 'Lavington', 'Ngara', 'Rongai']),
+    'Mombasa': (14, 0.8, ['Nyali', 'Bamburi', 'Tudor', 'Likoni', 'Mtwapa']),
+    'Kisumu': (9, 0.6, ['Milimani', 'Nyalenda', 'Mamboleo', 'Kondele']),
+    'Nakuru': (9, 0.6, ['Milimani', 'Section 58', 'Lanet', 'Kiamunyi']),
+    'Eldoret': (8, 0.55, ['Elgon View', 'Kapsoya', 'Pioneer', 'Langas']),
+    'Thika': (6, 0.5, ['Makongeni', 'Section 9', 'Ngoingwa']),
+    'Nyeri': (4, 0.45, ['Ruringu', 'Skuta', 'Kamakwa']),
+    'Machakos': (4, 0.45, ['Mjini', 'Katoloni', 'Kenya Israel']),
+    'Malindi': (3, 0.6, ['Casuarina', 'Shella', 'Mtangani']),
+    'Kitale': (3, 0.4, ['Milimani', 'Section 6']),
+}
+STREETS = ['Moi Avenue', 'Kenyatta Road', 'Ngong Road', 'Riverside Drive', 'Oginga Odinga Street',
+           'Uhuru Highway', 'Nyerere Road', 'Mama Ngina Street', 'Argwings Kodhek Road', 'Kimathi Street']
+# Type -> (share, bedroom range, base monthly rent per unit, (shortest, longest) stay in nights)
+PROPERTY_TYPES = {
+    'Apartment': (45, (1, 3), 18000, (30, 180)),
+    'Bedsitter': (20, (1, 1), 9000, (30, 180)),
+    'Hostel': (15, (1, 1), 6000, (30, 120)),
+    'Maisonette': (8, (3, 5), 30000, (60, 180)),
+    'Airbnb': (12, (1, 3), 4000, (1, 7)),
+}
+PAYMENT_METHODS = (['M-Pesa', 'Bank Transfer', 'Card', 'Cash'], [70, 15, 10, 5])
+ISSUE_TITLES = {
+    IssueType.MAINTENANCE: ['Leaking kitchen tap', 'No hot water', 'Broken window latch', 'Power outage in unit',
+                            'Blocked drainage', 'Faulty door lock', 'Water tank empty'],
+    IssueType.DISPUTE: ['Deposit refund delayed', 'Noise from neighbours', 'Disputed utility bill',
+                        'Parking space taken'],
+}
+
+
+def _weighted(rng, choices):
+    """A function drawing from ``{value: weight}`` with ``rng``."""
+    values = list(choices)
+    cumulative = list(itertools.accumulate(choices[value] for value in values))
+    return lambda: values[bisect.bisect(cumulative, rng.random() * cumulative[-1])]
+
+
+class _BatchWriter:
+    """Buffers generated rows and writes them in batches.
+
+    Each batch is one executemany of a cached INSERT: the driver's own on
+    SQLite, multi-row INSERT ... VALUES pages on PostgreSQL. Building the
+    statement with ``insert().values(rows)`` instead recompiles it for every
+    batch, which took most of the run time.
+
+    Tables are listed parents first, and any full buffer flushes every
+    table in that order, so no row is written before the rows it references.
+    """
+
+    def __init__(self, tables, batch_size):
+        self.tables = tables
+        self.batch_size = batch_size
+        self.buffers = {table: [] for table in tables}
+        self.counts = {table.name: 0 for table in tables}
+
+    def add(self, table, row):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for table in self.tables:
+            rows = self.buffers[table]
+            if rows:
+                db.session.execute(insert(table), rows)
+                self.counts[table.name] += len(rows)
+                self.buffers[table] = []
+
+
+def _next_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _sync_sequences(models):
+    # Ids are assigned here rather than by the database, so move PostgreSQL's
+    # sequences past them before anything else inserts
+    if db.session.connection().dialect.name != 'postgresql':
+        return
+    for model in models:
+        table = model.__tablename__
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"))
+
+
+def generate_dataset(landlords, tenants, properties, bookings_per_property=4, seed=0,
+                     batch_size=GENERATE_BATCH_SIZE, now=None):
+    """Insert a synthetic, reproducible dataset and return the rows written per table.
+
+    The same arguments, seed and day (``now``) produce the same rows on an
+    empty database (only the password hash's salt differs); new ids follow
+    on from existing ones. Landlord
+    portfolio sizes follow a Zipf-like curve, so a few landlords own most
+    listings. Each property's bookings are laid out back to back on its own
+    calendar, so PENDING and CONFIRMED bookings never overlap and get their
+    ``booking_nights`` rows. Everything is added to the existing data in a
+    single transaction and the rollups are rebuilt at the end.
+    """
+    rng = random.Random(seed)
+    # Dates are laid out around midnight of ``now``, so runs on the same day match
+    now = (now or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    window_start = now - timedelta(days=365)
+    window_end = now + timedelta(days=180)
+    password_hash = generate_password_hash(SYNTHETIC_PASSWORD)
+
+    writer = _BatchWriter([
+        User.__table__, Property.__table__, PropertyImage.__table__, Booking.__table__,
+        BookingNight.__table__, Payment.__table__, Issue.__table__, Notification.__table__,
+    ], batch_size)
+    first_ids = {model: _next_id(model) for model in
+                 (User, Property, PropertyImage, Booking, Payment, Issue, Notification)}
+    ids = {model: itertools.count(first_id) for model, first_id in first_ids.items()}
+
+    def moment(start, end):
+        return start + timedelta(seconds=rng.randrange(max(int((end - start).total_seconds()), 1)))
+
+    def person(user_type):
+        user_id = next(ids[User])
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created = moment(window_start - timedelta(days=365), window_start)
+        writer.add(User.__table__, {
+            'id': user_id, 'email': f'{first}.{last}.{user_id}@example.com'.lower(),
+            'password_hash': password_hash, 'first_name': first, 'last_name': last,
+            'phone': f'+2547{rng.randrange(10 ** 8):08d}', 'user_type': user_type,
+            'created_at': created, 'updated_at': created,
+        })
+        return user_id
+
+    with deferred_property_index() as new_property_ids:
+        landlord_ids = [person(UserType.LANDLORD) for _ in range(landlords)]
+        tenant_ids = [person(UserType.STUDENT if rng.random() < 0.2 else UserType.TENANT) for _ in range(tenants)]
+
+        # Zipf-like portfolio sizes: the landlord at rank r gets weight 1 / r
+        pick_landlord = _weighted(rng, {landlord_id: 1 / rank for rank, landlord_id in enumerate(landlord_ids, 1)})
+        pick_city = _weighted(rng, {city: share for city, (share, _, _) in CITIES.items()})
+        pick_type = _weighted(rng, {name: spec[0] for name, spec in PROPERTY_TYPES.items()})
+        pick_status = _weighted(rng, {PropertyStatus.AVAILABLE: 70, PropertyStatus.OCCUPIED: 25,
+                                      PropertyStatus.MAINTENANCE: 5})
+        pick_issue_status = _weighted(rng, {IssueStatus.OPEN: 25, IssueStatus.IN_PROGRESS: 15,
+                                            IssueStatus.RESOLVED: 60})
+
+        for _ in range(properties):
+            property_id = next(ids[Property])
+            new_property_ids.append(property_id)
+            city = pick_city()
+            _, multiplier, neighbourhoods = CITIES[city]
+            kind = pick_type()
+            _, (fewest, most), base_rent, (shortest, longest) = PROPERTY_TYPES[kind]
+            bedrooms = rng.randint(fewest, most)
+            monthly = base_rent * bedrooms ** 0.8 * multiplier * rng.lognormvariate(0, 0.25)
+            rent = Decimal(max(500, round(monthly / 500) * 500)) if kind != 'Airbnb' else Decimal(round(monthly, -2))
+            tenant_id = rng.choice(tenant_ids)
+            created = moment(window_start - timedelta(days=180), window_start)
+            neighbourhood = rng.choice(neighbourhoods)
+            writer.add(Property.__table__, {
+                'id': property_id,
+                'title': f'{bedrooms}-Bedroom {kind} in {neighbourhood}',
+                'description': f'{kind} in {neighbourhood}, {city}. '
+                               f"{rng.choice(['Secure parking', 'Borehole water', 'Backup generator', 'Fibre internet', 'Near the matatu stage'])}"
+                               f" and {rng.choice(['24h security', 'a balcony', 'a fitted kitchen', 'a shared compound', 'CCTV'])}.",
+                'address': f'{rng.randint(1, 400)} {rng.choice(STREETS)}, {neighbourhood}',
+                'city': city, 'rent_amount': rent, 'bedrooms': bedrooms,
+                'bathrooms': max(1, bedrooms - rng.randint(0, 1)),
+                'area_sqft': int(bedrooms * rng.randint(280, 520)), 'url': '', 'type': kind,
+                'status': pick_status(), 'landlord_id': pick_landlord(), 'tenant_id': tenant_id,
+                'created_at': created, 'updated_at': created,
+            })
+
+            for order in range(rng.randint(1, 6)):
+                image_id = next(ids[PropertyImage])
+                public_id = f'synthetic/property_{property_id}_{order}'
+                writer.add(PropertyImage.__table__, {
+                    'id': image_id, 'property_id': property_id,
+                    'image_url': f'https://res.cloudinary.com/demo/image/upload/{public_id}.jpg',
+                    'thumbnail_url': f'https://res.cloudinary.com/demo/image/upload/w_200,h_150,c_fill/{public_id}.jpg',
+                    'public_id': public_id, 'is_primary': order == 0, 'display_order': order,
+                    'created_at': created, 'updated_at': created,
+                })
+
+            # Walk the property's calendar: each stay starts after the previous one ends
+            start = window_start + timedelta(days=rng.randrange(60))
+            for _ in range(rng.randint(0, 2 * bookings_per_property)):
+                nights = rng.randint(shortest, longest)
+                end = start + timedelta(days=nights)
+                if end > window_end:
+                    break
+                booking_id = next(ids[Booking])
+                guest = rng.choice(tenant_ids)
+                if rng.random() < 0.1:
+                    status = BookingStatus.CANCELLED
+                elif start > now and rng.random() < 0.4:
+                    status = BookingStatus.PENDING
+                else:
+                    status = BookingStatus.CONFIRMED
+                booked = moment(start - timedelta(days=60), start)
+                writer.add(Booking.__table__, {
+                    'id': booking_id, 'tenant_id': guest, 'property_id': property_id,
+                    'start_date': start, 'end_date': end, 'status': status,
+                    'created_at': booked, 'updated_at': booked, 'special_requests': None,
+                })
+                if status != BookingStatus.CANCELLED:
+                    for night in nights_between(start, end):
+                        writer.add(BookingNight.__table__,
+                                   {'property_id': property_id, 'night': night, 'booking_id': booking_id})
+                if status == BookingStatus.CONFIRMED:
+                    payment_id = next(ids[Payment])
+                    amount = rent if kind != 'Airbnb' else rent * nights
+                    if start > now:
+                        payment_status, paid = PaymentStatus.PENDING, None
+                    elif rng.random() < 0.03:
+                        payment_status, paid = PaymentStatus.FAILED, None
+                    else:
+                        payment_status, paid = PaymentStatus.COMPLETED, start - timedelta(days=rng.randint(0, 5))
+                    writer.add(Payment.__table__, {
+                        'id': payment_id, 'amount': amount, 'payment_date': paid, 'due_date': start,
+                        'status': payment_status, 'payment_method': rng.choices(*PAYMENT_METHODS)[0],
+                        'transaction_id': f'SYN{payment_id:010d}' if paid else None,
+                        'notes': f"Rent for {start.strftime('%Y-%m')}", 'user_id': guest,
+                        'property_id': property_id, 'booking_id': booking_id,
+                        'period': start.strftime('%Y-%m'), 'created_at': booked, 'updated_at': paid or booked,
+                    })
+                start = end + timedelta(days=rng.choice([0, 0, 1, 3, 7, 14, 30]))
+
+            while rng.random() < 0.4:
+                issue_type = IssueType.MAINTENANCE if rng.random() < 0.85 else IssueType.DISPUTE
+                status = pick_issue_status()
+                reported = moment(window_start, now)
+                title = rng.choice(ISSUE_TITLES[issue_type])
+                writer.add(Issue.__table__, {
+                    'id': next(ids[Issue]), 'title': title,
+                    'description': f'{title} reported at {neighbourhood}, {city}.',
+                    'issue_type': issue_type, 'status': status,
+                    'priority': rng.choices(['low', 'medium', 'high'], [30, 50, 20])[0],
+                    'reporter_id': tenant_id, 'property_id': property_id,
+                    'resolved_at': reported + timedelta(days=rng.randint(1, 21)) if status == IssueStatus.RESOLVED else None,
+                    'created_at': reported, 'updated_at': reported,
+                })
+
+        property_ids = range(first_ids[Property], first_ids[Property] + properties)
+        for tenant_id in tenant_ids:
+            for _ in range(rng.randint(0, 6)):
+                kind = rng.choice(list(NotificationType))
+                sent = moment(window_start, now)
+                writer.add(Notification.__table__, {
+                    'id': next(ids[Notification]), 'title': kind.value.replace('_', ' ').capitalize(),
+                    'message': f'{kind.value.replace("_", " ").capitalize()} for your rental.',
+                    'notification_type': kind, 'is_read': rng.random() < 0.6, 'user_id': tenant_id,
+                    'property_id': rng.choice(property_ids) if property_ids else None,
+                    'created_at': sent, 'updated_at': sent,
+                })
+        writer.flush()
+
+    _sync_sequences(first_ids)
+    rebuild_rollups()
+    db.session.commit()
+    return writer.counts
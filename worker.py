@@ -0,0 +1,24 @@
+"""Background worker: runs the scheduled jobs (rent reminders, outbox).
+
+Run one or more of these next to the web server:
+
+    python worker.py
+
+The web app itself never starts the scheduler, so gunicorn workers and
+flask CLI commands stay free of polling threads. Set WORKER_METRICS_PORT
+to serve the job metrics on that port for Prometheus.
+"""
+import logging
+import os
+
+from app import run_scheduler
+from metrics import start_metrics_server
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    metrics_port = os.getenv('WORKER_METRICS_PORT')
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+        logging.info(f"Serving job metrics on port {metrics_port}")
+    logging.info("Starting scheduler worker...")
+    run_scheduler()